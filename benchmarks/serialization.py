@@ -0,0 +1,98 @@
+"""比较 pickle 与 ``tagfindutils.serialization`` 的编码大小和编解码速度。
+
+pickle 直接序列化包含原始响应的对象；本库只编码规范化后的字段，解码得到的对象在首次读取属性时才构造原始响应，
+因此“解码”一栏不包含这部分开销，“解码并读取”一栏则包含。
+
+用法：``python benchmarks/serialization.py [数量]``
+"""
+from __future__ import annotations
+
+import pickle
+import sys
+import timeit
+
+from tagfindutils import serialization
+from tagfindutils.cloudmusic import CloudMusicSearchResult, CloudMusicSongDetail
+from tagfindutils.qqmusic import QQMusicSearchResult, QQMusicSongDetail
+
+
+def _cloudmusic_raw(idx: int) -> dict:
+    # 字段与网易云音乐接口返回的结构保持一致，包括本库不会用到的字段
+    return {
+        'name': f'朝が来る {idx}',
+        'id': 1902312104 + idx,
+        'pst': 0, 't': 0, 'pop': 100, 'st': 0, 'rt': '', 'fee': 8, 'v': 12,
+        'ar': [{'id': 16152, 'name': 'Aimer', 'tns': [], 'alias': []}],
+        'alia': ['TV动画《鬼灭之刃 花街篇》片尾曲'],
+        'tns': ['拂晓将至'],
+        'al': {
+            'id': 137312734, 'name': '朝が来る', 'tns': [],
+            'picUrl': 'http://p4.music.126.net/bCQCvWXXufd7XVvtg5iHkw==/109951166714320898.jpg'
+        },
+        'dt': 263000,
+        'h': {'br': 320000, 'fid': 0, 'size': 10523565, 'vd': -49373},
+        'm': {'br': 192000, 'fid': 0, 'size': 6314157, 'vd': -46826},
+        'l': {'br': 128000, 'fid': 0, 'size': 4209452, 'vd': -45231},
+        'publishTime': 1641744000000
+    }
+
+
+def _qqmusic_search_raw(idx: int) -> dict:
+    return {
+        'songname': 'Enemies', 'songid': 333415000 + idx, 'songmid': '003nYL8b2u6ygu',
+        'albumname': 'Enemies', 'albumid': 27470800, 'albummid': '000v14Zi196WkA',
+        'singer': [{'id': 1218826, 'mid': '0023TAHr2UmE2p', 'name': 'The Score', 'name_hilight': 'The Score'}],
+        'lyric': '', 'lyric_hilight': '', 'pubtime': 1642089600, 'interval': 178,
+        'size128': 2860000, 'size320': 7150000, 'sizeflac': 20000000, 'vid': '', 'strMediaMid': '003nYL8b2u6ygu'
+    }
+
+
+def _qqmusic_detail_raw(idx: int) -> dict:
+    return {
+        'data': {
+            'track_info': {
+                'id': 333415000 + idx, 'mid': '003nYL8b2u6ygu', 'name': 'Enemies', 'title': 'Enemies',
+                'subtitle': '', 'interval': 178, 'time_public': '2022-01-14',
+                'singer': [{'id': 1218826, 'mid': '0023TAHr2UmE2p', 'name': 'The Score', 'type': 0}],
+                'album': {'id': 27470800, 'mid': '000v14Zi196WkA', 'name': 'Enemies', 'time_public': '2022-01-14'},
+                'file': {'media_mid': '003nYL8b2u6ygu', 'size_128mp3': 2860000, 'size_320mp3': 7150000}
+            },
+            'extras': {'name': 'Enemies', 'transname': ''},
+            'info': {
+                'genre': {'title': '流派', 'type': 'genre', 'content': [{'id': 1, 'value': 'Pop', 'mid': ''}]},
+                'company': {'title': '唱片公司', 'type': 'company', 'content': [{'id': 2, 'value': 'INgrooves'}]},
+                'lan': {'title': '语种', 'type': 'lan', 'content': [{'id': 3, 'value': '英语'}]}
+            }
+        }
+    }
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    cases = {
+        'CloudMusicSearchResult': [CloudMusicSearchResult(_cloudmusic_raw(_)) for _ in range(count)],
+        'CloudMusicSongDetail': [CloudMusicSongDetail(_cloudmusic_raw(_)) for _ in range(count)],
+        'QQMusicSearchResult': [QQMusicSearchResult(_qqmusic_search_raw(_)) for _ in range(count)],
+        'QQMusicSongDetail': [QQMusicSongDetail(_qqmusic_detail_raw(_)) for _ in range(count)]
+    }
+
+    print(f'{"类型":<24}{"方式":<10}{"平均大小(B)":>12}{"编码(us)":>12}{"解码(us)":>12}{"解码并读取(us)":>16}')
+    for name, objs in cases.items():
+        for method, dumps, loads in (('pickle', pickle.dumps, pickle.loads),
+                                     ('binary', serialization.encode, serialization.decode)):
+            encoded = [dumps(_) for _ in objs]
+            for obj, data in zip(objs, encoded):
+                assert loads(data).to_dict() == obj.to_dict()
+            size = sum(len(_) for _ in encoded) / count
+            # 取多次运行中最快的一次，以减少其他进程的干扰
+            encode_us = min(timeit.repeat(lambda: [dumps(_) for _ in objs], number=1, repeat=5)) / count * 1e6
+            decode_us = min(timeit.repeat(lambda: [loads(_) for _ in encoded], number=1, repeat=5)) / count * 1e6
+            # 解码后读取一个属性：本库解码得到的对象在此时才构造原始响应
+            access_us = min(
+                timeit.repeat(lambda: [loads(_).songname for _ in encoded], number=1, repeat=5)
+            ) / count * 1e6
+            print(f'{name:<24}{method:<10}{size:>12.1f}{encode_us:>12.2f}{decode_us:>12.2f}{access_us:>16.2f}')
+
+
+if __name__ == '__main__':
+    main()
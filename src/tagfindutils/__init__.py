@@ -1,21 +1,70 @@
 from __future__ import annotations
 
+from typing import Iterable
+
+import requests
+
 from . import cloudmusic
 from . import qqmusic
-from .structures import SearchResult
+from .circuitbreaker import CircuitOpenError, breakers
+from .structures import AlbumSearchResult, SearchResult
 
 __VERSION__ = '0.1.2'
 
 
-def supported_sources():
+def supported_sources(available_only=False):
     """列出支持的歌曲信息搜索来源，以及对应的搜索入口函数。
 
     目前支持的搜索来源：
 
     - cloudmusic - 网易云音乐
     - qqmusic - QQ 音乐
+
+    Args:
+        available_only (bool): 只列出熔断器未断开的来源；默认为否
     """
-    return {
+    sources = {
         'cloudmusic': cloudmusic.search,
         'qqmusic': qqmusic.search
     }
+    if available_only:
+        return {k: v for k, v in sources.items() if k not in breakers or breakers[k].allows_request()}
+    return sources
+
+
+def search_with_failover(*keywords: str,
+                         sources: Iterable[str] | None = None,
+                         **search_kwargs
+                         ) -> tuple[str, list[SearchResult]]:
+    """按顺序尝试各个来源进行搜索，跳过熔断器已断开的来源，并在出错时自动切换到下一个来源。
+
+    Args:
+        keywords (str): 关键词
+        sources: 按优先级排列的来源名称；默认为 ``supported_sources()`` 中的顺序
+        **search_kwargs: 传递给各来源 ``search()`` 的其他参数
+    Raises:
+        ValueError: 指定了不支持的来源
+        CircuitOpenError: 所有来源的熔断器均已断开
+        requests.RequestException: 所有可用来源均出错时，最后一个来源引发的错误
+
+    返回一个元组：(实际使用的来源名称, 搜索结果)
+    """
+    all_sources = supported_sources()
+    if sources is None:
+        sources = all_sources.keys()
+
+    last_error: requests.RequestException | None = None
+    for name in sources:
+        if name not in all_sources:
+            raise ValueError(f'不支持的搜索来源：{repr(name)}')
+        breaker = breakers.get(name)
+        if breaker is not None and not breaker.allows_request():
+            continue
+        try:
+            return name, all_sources[name](*keywords, **search_kwargs)
+        except requests.RequestException as exc:
+            last_error = exc
+
+    if last_error is not None:
+        raise last_error
+    raise CircuitOpenError('所有来源的熔断器均已断开')
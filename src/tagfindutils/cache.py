@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from threading import Condition, Lock, Thread
+from typing import Callable, Hashable
+
+from .structures import SongDetail
+from .utils import T
+
+
+class QueryCache:
+    """带有过期时间的 LRU 缓存，同时合并针对同一个键的并发请求。
+
+    多个线程同时请求同一个尚未缓存的键时，只有第一个线程会调用 ``fetch``，
+    其余线程等待并共享其结果；``fetch`` 引发的异常会传递给所有等待者，且不会被缓存。
+
+    Args:
+        maxsize (int): 最多缓存的条目数量，默认为 1024
+        ttl (float): 条目的有效时间（秒），默认为 600
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 600.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, object]] = OrderedDict()
+        self._inflight: dict[Hashable, Future] = {}
+        self._lock = Lock()
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], T]) -> T:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if time.monotonic() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = fetch()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(value)
+            with self._lock:
+                self._entries[key] = (time.monotonic(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            return value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+search_cache = QueryCache()
+"""``search(..., cached=True)`` 使用的搜索结果缓存。"""
+
+
+class DetailCache:
+    """以“过期仍可用，后台再验证”（stale-while-revalidate）方式缓存歌曲详细信息。
+
+    - 未超过 ``soft_ttl`` 的条目直接返回；
+    - 超过 ``soft_ttl`` 但未超过 ``hard_ttl`` 的条目仍会直接返回，
+      同时被加入后台刷新队列，由后台线程合并为批次重新获取；
+    - 超过 ``hard_ttl`` 或不存在的条目，会在调用者的线程中同步获取。
+
+    Args:
+        fetch (Callable[..., list[SongDetail]]): 根据一个或多个 ID 获取详细信息的函数
+        key_of (Callable[[SongDetail], Hashable]): 从详细信息中取出其 ID 的函数
+        normalize_id (Callable[[Hashable], Hashable]): 将传入的 ID 转换为 ``key_of`` 返回值的形式
+        soft_ttl (float): 条目需要在后台刷新之前的时间（秒），默认为 1 天
+        hard_ttl (float): 条目彻底失效的时间（秒），默认为 7 天
+        maxsize (int): 最多缓存的条目数量，默认为 4096
+        batch_size (int): 后台刷新时每批最多包含的 ID 数量，默认为 50
+        batch_delay (float): 后台刷新前等待更多过期条目加入批次的时间（秒），默认为 0.5
+    """
+
+    def __init__(self,
+                 fetch: Callable[..., list[SongDetail]],
+                 key_of: Callable[[SongDetail], Hashable],
+                 normalize_id: Callable[[Hashable], Hashable] = lambda _: _,
+                 soft_ttl: float = 86400.0,
+                 hard_ttl: float = 7 * 86400.0,
+                 maxsize: int = 4096,
+                 batch_size: int = 50,
+                 batch_delay: float = 0.5
+                 ) -> None:
+        self._fetch = fetch
+        self._key_of = key_of
+        self._normalize_id = normalize_id
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._entries: OrderedDict[Hashable, tuple[float, SongDetail]] = OrderedDict()
+        self._stale: dict[Hashable, None] = {}
+        self._cond = Condition()
+        self._refresher: Thread | None = None
+
+    def _store(self, details: list[SongDetail]) -> None:
+        now = time.monotonic()
+        with self._cond:
+            for detail in details:
+                key = self._key_of(detail)
+                if key is None:
+                    continue
+                self._entries[key] = (now, detail)
+                self._entries.move_to_end(key)
+                self._stale.pop(key, None)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_many(self, *ids: Hashable, **fetch_kwargs) -> list[SongDetail]:
+        """获取一个或多个 ID 对应的详细信息，按传入顺序返回；未能获取到的 ID 会被跳过。
+
+        Args:
+            *ids: 一个或多个 ID
+            **fetch_kwargs: 同步获取时传递给 ``fetch`` 的其他参数
+        Raises:
+            requests.RequestException: 同步获取时出现的网络、远端相关错误
+        """
+        keys = [self._normalize_id(_) for _ in ids]
+        now = time.monotonic()
+        found: dict[Hashable, SongDetail] = {}
+        missing: list[Hashable] = []
+        with self._cond:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None or now - entry[0] >= self.hard_ttl:
+                    if key not in missing:
+                        missing.append(key)
+                    continue
+                stored_at, detail = entry
+                found[key] = detail
+                self._entries.move_to_end(key)
+                if now - stored_at >= self.soft_ttl and key not in self._stale:
+                    self._stale[key] = None
+                    self._ensure_refresher()
+                    self._cond.notify()
+
+        if missing:
+            fetched = self._fetch(*missing, **fetch_kwargs)
+            self._store(fetched)
+            for detail in fetched:
+                key = self._key_of(detail)
+                if key is not None:
+                    found[key] = detail
+
+        return [found[_] for _ in keys if _ in found]
+
+    def _ensure_refresher(self) -> None:
+        if self._refresher is None or not self._refresher.is_alive():
+            self._refresher = Thread(target=self._refresh_loop, name='tagfindutils-refresh', daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stale:
+                    self._cond.wait()
+            # 等待一小段时间，让更多过期条目合并到同一批次中
+            time.sleep(self.batch_delay)
+            with self._cond:
+                batch = list(self._stale)[:self.batch_size]
+            try:
+                self._store(self._fetch(*batch))
+            except Exception:
+                # 刷新失败时保留旧条目，下次访问时再次尝试，直到其彻底失效
+                pass
+            with self._cond:
+                for key in batch:
+                    self._stale.pop(key, None)
+
+    def clear(self) -> None:
+        with self._cond:
+            self._entries.clear()
+            self._stale.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
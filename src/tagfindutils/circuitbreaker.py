@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import time
+from threading import Lock
+
+import requests
+
+
+class CircuitOpenError(requests.RequestException):
+    """来源的熔断器处于断开状态，请求未被发出。"""
+
+
+class CircuitBreaker:
+    """单个来源的熔断器，有三种状态：
+
+    - ``'closed'``：正常放行请求；连续失败 ``failure_threshold`` 次后转为 ``'open'``
+    - ``'open'``：直接拒绝请求；经过 ``recovery_timeout`` 秒后转为 ``'half-open'``
+    - ``'half-open'``：最多放行 ``half_open_max_calls`` 个试探请求；
+      试探成功则转为 ``'closed'``，失败则重新转为 ``'open'``
+
+    Args:
+        failure_threshold (int): 断开前允许的连续失败次数，默认为 5
+        recovery_timeout (float): 断开后等待多久（秒）开始试探，默认为 30
+        half_open_max_calls (int): 半开状态下同时放行的试探请求数量，默认为 1
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self,
+                 failure_threshold: int = 5,
+                 recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1
+                 ) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = Lock()
+
+    def _refresh_state(self) -> None:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh_state()
+            return self._state
+
+    def allows_request(self) -> bool:
+        """判断此刻是否会放行请求，不改变熔断器的状态。"""
+        with self._lock:
+            self._refresh_state()
+            if self._state == self.OPEN:
+                return False
+            if self._state == self.HALF_OPEN:
+                return self._half_open_calls < self.half_open_max_calls
+            return True
+
+    def before_call(self) -> None:
+        """在发出请求之前调用。
+
+        Raises:
+            CircuitOpenError: 熔断器处于断开状态，或半开状态下的试探请求名额已用完
+        """
+        with self._lock:
+            self._refresh_state()
+            if self._state == self.OPEN:
+                raise CircuitOpenError('熔断器已断开，暂停向此来源发出请求')
+            if self._state == self.HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    raise CircuitOpenError('熔断器处于半开状态，正在等待试探请求的结果')
+                self._half_open_calls += 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def record_neutral(self) -> None:
+        """记录一个既不算成功也不算失败的请求（如因调用者的截止时间而超时），只归还半开状态下的试探名额。"""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+
+breakers: dict[str, CircuitBreaker] = {
+    'cloudmusic': CircuitBreaker(),
+    'qqmusic': CircuitBreaker()
+}
+"""各个来源的熔断器；可以替换为使用不同参数的实例。"""
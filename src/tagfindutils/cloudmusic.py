@@ -2,17 +2,105 @@ from __future__ import annotations
 
 from copy import deepcopy as dp
 from datetime import datetime
+from itertools import zip_longest
+from typing import Any
 
 import requests
 
-from .rawquery import get_details_from_cloudmusic, get_search_results_from_cloudmusic
-from .structures import SearchResult, SongDetail
+from .cache import DetailCache, search_cache
+from .normalize import canonical_key, normalize_keywords
+from .rawquery import get_album_details_from_cloudmusic, get_details_from_cloudmusic, get_search_results_from_cloudmusic
+from .structures import AlbumSearchResult, SearchResult, SongDetail, _LazyRaw
+from .utils import notify_results
+
+_NoneType = type(None)
+
+
+def _raw_result_from_dict(data: dict[str, Any]) -> dict[str, str | int | list | dict | None]:
+    # 根据 to_dict() 导出的字段，构造出字段完全相同的原始响应
+    artists = []
+    for name, artistid in zip_longest(data.get('artists') or [], data.get('artistids') or []):
+        artists.append({'name': name, 'id': artistid})
+    publish_time = SearchResult._publish_time_from_dict(data)
+
+    return {
+        'name': data.get('songname'),
+        'id': data.get('songid'),
+        'ar': artists,
+        'al': {
+            'name': data.get('album'),
+            'id': data.get('albumid'),
+            'picUrl': data.get('coverurl')
+        },
+        'alia': list(data.get('aliases') or []),
+        'tns': list(data.get('translations') or []),
+        'publishTime': None if publish_time is None else round(publish_time.timestamp() * 1000)
+    }
+
+
+def _values_from_raw_result(raw_result: dict[str, Any]) -> list | None:
+    # 一次遍历原始响应，得到与 CloudMusicSearchResult 各个属性相同的值（按 _fields 的顺序）
+    name = raw_result.get('name')
+    songid = raw_result.get('id')
+    alb = raw_result.get('al')
+    alia = raw_result.get('alia')
+    tns = raw_result.get('tns')
+    arts = raw_result.get('ar')
+    time_us = raw_result.get('publishTime')
+    if not (isinstance(name, (str, _NoneType)) and isinstance(songid, (int, _NoneType))
+            and isinstance(alb, (dict, _NoneType)) and isinstance(alia, (list, _NoneType))
+            and isinstance(tns, (list, _NoneType)) and isinstance(arts, (list, _NoneType))
+            and isinstance(time_us, (int, _NoneType))):
+        return None
+
+    album = albumid = coverurl = None
+    if alb:
+        album = alb.get('name')
+        albumid = alb.get('id')
+        coverurl = alb.get('picUrl')
+        if not (isinstance(album, (str, _NoneType)) and isinstance(albumid, (int, _NoneType))
+                and isinstance(coverurl, (str, _NoneType))):
+            return None
+    aliases = [_ for _ in alia if _] if alia else []
+    translations = [_ for _ in tns if _] if tns else []
+    for item in aliases + translations:
+        if not isinstance(item, str):
+            return None
+    artists = []
+    artistids = []
+    if arts:
+        for item in arts:
+            if not isinstance(item, dict):
+                return None
+            artist_name = item.get('name')
+            artist_id = item.get('id')
+            if not (isinstance(artist_name, (str, _NoneType)) and isinstance(artist_id, (int, _NoneType))):
+                return None
+            if artist_name:
+                artists.append(artist_name)
+            if artist_id:
+                artistids.append(artist_id)
+    publish_time = None if time_us is None else datetime.fromtimestamp(time_us / 1000)
+
+    return [name, songid, album, albumid, aliases, translations, artists, artistids, coverurl, publish_time]
 
 
 class CloudMusicSongDetail(SongDetail):
     def __init__(self, raw_result: dict[str, str | int | list | dict | None]) -> None:
         self._raw_result = dp(raw_result)
 
+    _raw_result = _LazyRaw()
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CloudMusicSongDetail:
+        return cls._from_raw(_raw_result=_raw_result_from_dict(data))
+
+    def _values_from_raw(self) -> list | None:
+        values = _values_from_raw_result(self._raw_result)
+        if values is not None:
+            values += [[], []]
+        return values
+
     @property
     def album(self) -> str | None:
         alb: dict[str, str | int | list[str]] | None = self.type_filter(self._raw_result.get('al'), dict)
@@ -108,6 +196,15 @@ class CloudMusicSearchResult(SearchResult):
     def __init__(self, raw_result: dict[str, str | int | list | dict]) -> None:
         self._raw_result = dp(raw_result)
 
+    _raw_result = _LazyRaw()
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CloudMusicSearchResult:
+        return cls._from_raw(_raw_result=_raw_result_from_dict(data))
+
+    def _values_from_raw(self) -> list | None:
+        return _values_from_raw_result(self._raw_result)
+
     @property
     def album(self) -> str | None:
         alb: dict[str, str | int | list[str]] | None = self.type_filter(self._raw_result.get('al'), dict)
@@ -197,9 +294,69 @@ class CloudMusicSearchResult(SearchResult):
                 return ret[0]
 
 
+class CloudMusicAlbumSearchResult(AlbumSearchResult):
+    def __init__(self, raw_result: dict[str, str | int | list | dict]) -> None:
+        self._raw_result = dp(raw_result)
+
+    @property
+    def album(self) -> str | None:
+        return self.type_filter(self._raw_result.get('name'), str)
+
+    @property
+    def albumid(self) -> int | None:
+        return self.type_filter(self._raw_result.get('id'), int)
+
+    @property
+    def artists(self) -> list[str]:
+        arts: list[dict[str, str | int | list[str]]] | None = self.type_filter(self._raw_result.get('artists'), list)
+        ret: list[str] = []
+        if arts:
+            for item in arts:
+                artist_name = self.type_filter(item.get('name'), str)
+                if artist_name:
+                    ret.append(artist_name)
+
+        return ret
+
+    @property
+    def artistids(self) -> list[int]:
+        arts: list[dict[str, str | int | list[str]]] | None = self.type_filter(self._raw_result.get('artists'), list)
+        ret: list[int] = []
+        if arts:
+            for item in arts:
+                artist_id = self.type_filter(item.get('id'), int)
+                if artist_id:
+                    ret.append(artist_id)
+
+        return ret
+
+    @property
+    def coverurl(self) -> str | None:
+        return self.type_filter(self._raw_result.get('picUrl'), str)
+
+    @property
+    def publish_time(self) -> datetime | None:
+        time_us = self.type_filter(self._raw_result.get('publishTime'), int)
+        if time_us is not None:
+            time_ms: float = time_us / 1000
+            return datetime.fromtimestamp(time_ms)
+
+    @property
+    def track_count(self) -> int | None:
+        return self.type_filter(self._raw_result.get('size'), int)
+
+    def get_tracklist(self) -> list[CloudMusicSongDetail]:
+        if self.albumid is not None:
+            return album_details(self.albumid)
+        return []
+
+
 def search(*keywords: str,
            result_pageidx: int = 0,
            result_size: int = 10,
+           timeout: float | None = None,
+           hedge: float | None = None,
+           cached: bool = False
            ) -> list[CloudMusicSearchResult]:
     """根据关键词，从 QQ 音乐获取匹配关键词的歌曲的信息。
 
@@ -207,10 +364,31 @@ def search(*keywords: str,
         keywords (str): 关键词
         result_pageidx (int): 搜索结果的所在的页码，默认为 0
         result_size (int): 搜索结果的数量，默认为 10
+        timeout (float | None): 本次调用的截止时间（秒），默认不限制
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100），默认不发出对冲请求
+        cached (bool): 规范化关键词，并通过 ``cache.search_cache`` 缓存和合并请求；
+            规范键相同的搜索只会发出一次网络请求。默认为否
     Raises:
         requests.RequestException: 网络、远端相关错误
     """
-    _full_result = get_search_results_from_cloudmusic(*keywords, result_pageidx=result_pageidx, result_size=result_size)
+    if cached:
+        key = ('cloudmusic', canonical_key(*keywords), result_pageidx, result_size)
+        return list(
+            search_cache.get_or_fetch(
+                key,
+                lambda: search(*normalize_keywords(*keywords),
+                               result_pageidx=result_pageidx,
+                               result_size=result_size,
+                               timeout=timeout,
+                               hedge=hedge)
+            )
+        )
+
+    _full_result = get_search_results_from_cloudmusic(*keywords,
+                                                      result_pageidx=result_pageidx,
+                                                      result_size=result_size,
+                                                      timeout=timeout,
+                                                      hedge=hedge)
     if isinstance(_full_result, requests.Response):
         full_result: dict = _full_result.json()
     else:
@@ -221,16 +399,30 @@ def search(*keywords: str,
         for item in raw_results:
             ret.append(CloudMusicSearchResult(item))
 
+    notify_results(ret)
     return ret
 
 
-def details(*songids: int | str) -> list[CloudMusicSongDetail]:
+def details(*songids: int | str,
+            timeout: float | None = None,
+            hedge: float | None = None,
+            cached: bool = False
+            ) -> list[CloudMusicSongDetail]:
     """根据一个或多个 songid 从网易云音乐获取一首/多首歌曲的详细信息。
 
     Args:
         *songids: 一个或多个歌曲 ID
+        timeout (float | None): 本次调用的截止时间（秒），默认不限制
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100），默认不发出对冲请求
+        cached (bool): 通过 ``detail_cache`` 获取详细信息：未过期的缓存直接返回，
+            过期的缓存先返回、再在后台刷新；默认为否
+    Raises:
+        requests.RequestException: 网络、远端相关错误
     """
-    _full_result = get_details_from_cloudmusic(*songids, raw_response=False)
+    if cached:
+        return detail_cache.get_many(*songids, timeout=timeout, hedge=hedge)
+
+    _full_result = get_details_from_cloudmusic(*songids, raw_response=False, timeout=timeout, hedge=hedge)
     if isinstance(_full_result, requests.Response):
         full_result: dict = _full_result.json()
     else:
@@ -241,4 +433,70 @@ def details(*songids: int | str) -> list[CloudMusicSongDetail]:
         for item in raw_results:
             ret.append(CloudMusicSongDetail(item))
 
+    notify_results(ret)
+    return ret
+
+
+detail_cache = DetailCache(fetch=details, key_of=lambda _: _.songid, normalize_id=int)
+"""``details(..., cached=True)`` 使用的详细信息缓存。"""
+
+
+def search_albums(*keywords: str,
+                  result_pageidx: int = 0,
+                  result_size: int = 10,
+                  timeout: float | None = None,
+                  hedge: float | None = None
+                  ) -> list[CloudMusicAlbumSearchResult]:
+    """根据关键词，从网易云音乐获取匹配关键词的专辑的信息。
+
+    Args:
+        keywords (str): 关键词
+        result_pageidx (int): 搜索结果的所在的页码，默认为 0
+        result_size (int): 搜索结果的数量，默认为 10
+        timeout (float | None): 本次调用的截止时间（秒），默认不限制
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100），默认不发出对冲请求
+    Raises:
+        requests.RequestException: 网络、远端相关错误
+    """
+    full_result: dict = get_search_results_from_cloudmusic(*keywords,
+                                                           result_pageidx=result_pageidx,
+                                                           result_size=result_size,
+                                                           result_type=10,
+                                                           timeout=timeout,
+                                                           hedge=hedge)
+    ret = []
+    if full_result:
+        raw_results: list[dict] = full_result['result'].get('albums', [])
+        for item in raw_results:
+            ret.append(CloudMusicAlbumSearchResult(item))
+
+    return ret
+
+
+def album_details(albumid: int | str,
+                  timeout: float | None = None,
+                  hedge: float | None = None
+                  ) -> list[CloudMusicSongDetail]:
+    """根据专辑的 albumid，通过一次请求从网易云音乐获取专辑的完整曲目列表。
+
+    Args:
+        albumid (int | str): 专辑 ID
+        timeout (float | None): 本次调用的截止时间（秒），默认不限制
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100），默认不发出对冲请求
+    Raises:
+        requests.RequestException: 网络、远端相关错误
+    """
+    full_result: dict = get_album_details_from_cloudmusic(albumid, timeout=timeout, hedge=hedge)
+    ret = []
+    if full_result:
+        album_info: dict = full_result.get('album') or {}
+        raw_results: list[dict] = full_result['songs']
+        for item in raw_results:
+            # 曲目列表中的专辑信息可能缺少封面链接，使用专辑本身的信息补全
+            alb: dict = item.setdefault('al', {})
+            if not alb.get('picUrl') and album_info.get('picUrl'):
+                alb['picUrl'] = album_info['picUrl']
+            ret.append(CloudMusicSongDetail(item))
+
+    notify_results(ret)
     return ret
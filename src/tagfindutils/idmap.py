@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import sqlite3
+from os import PathLike
+from threading import Lock
+
+from . import cloudmusic, qqmusic
+from .cloudmusic import CloudMusicSearchResult, CloudMusicSongDetail
+from .qqmusic import QQMusicSearchResult, QQMusicSongDetail
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS song_map (
+    qqmusic_songmid TEXT NOT NULL UNIQUE,
+    cloudmusic_songid INTEGER NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS album_map (
+    qqmusic_albummid TEXT NOT NULL UNIQUE,
+    cloudmusic_albumid INTEGER NOT NULL UNIQUE
+);
+"""
+
+
+class IDMapping:
+    """记录 QQ 音乐与网易云音乐之间已确认等价的歌曲、专辑 ID，并持久化到 SQLite 数据库。
+
+    已知一个平台的 ID 时，可以通过 ``resolve_cloudmusic()`` / ``resolve_qqmusic()``
+    直接获取另一个平台的详细信息，无需搜索和匹配。
+
+    每个 ID 最多对应另一个平台的一个 ID；对同一个 ID 重复确认时，以最后一次为准。
+
+    Args:
+        path (str | PathLike): 数据库文件的路径；默认为 ``':memory:'``（不持久化）
+    """
+
+    def __init__(self, path: str | PathLike = ':memory:') -> None:
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> IDMapping:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def link_songs(self, qqmusic_songmid: str, cloudmusic_songid: int | str) -> None:
+        """记录一对等价的歌曲 ID。"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO song_map VALUES (?, ?)',
+                (qqmusic_songmid, int(cloudmusic_songid))
+            )
+
+    def link_albums(self, qqmusic_albummid: str, cloudmusic_albumid: int | str) -> None:
+        """记录一对等价的专辑 ID。"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO album_map VALUES (?, ?)',
+                (qqmusic_albummid, int(cloudmusic_albumid))
+            )
+
+    def link(self,
+             qqmusic_result: QQMusicSearchResult | QQMusicSongDetail,
+             cloudmusic_result: CloudMusicSearchResult | CloudMusicSongDetail
+             ) -> None:
+        """记录两个已确认为同一首歌曲的结果，歌曲 ID 和专辑 ID 均会被记录。"""
+        if qqmusic_result.songmid and cloudmusic_result.songid is not None:
+            self.link_songs(qqmusic_result.songmid, cloudmusic_result.songid)
+        if qqmusic_result.albummid and cloudmusic_result.albumid is not None:
+            self.link_albums(qqmusic_result.albummid, cloudmusic_result.albumid)
+
+    def _query_one(self, sql: str, param: str | int) -> str | int | None:
+        with self._lock:
+            row = self._conn.execute(sql, (param,)).fetchone()
+        if row:
+            return row[0]
+
+    def cloudmusic_songid(self, qqmusic_songmid: str) -> int | None:
+        return self._query_one(
+            'SELECT cloudmusic_songid FROM song_map WHERE qqmusic_songmid = ?', qqmusic_songmid
+        )
+
+    def qqmusic_songmid(self, cloudmusic_songid: int | str) -> str | None:
+        return self._query_one(
+            'SELECT qqmusic_songmid FROM song_map WHERE cloudmusic_songid = ?', int(cloudmusic_songid)
+        )
+
+    def cloudmusic_albumid(self, qqmusic_albummid: str) -> int | None:
+        return self._query_one(
+            'SELECT cloudmusic_albumid FROM album_map WHERE qqmusic_albummid = ?', qqmusic_albummid
+        )
+
+    def qqmusic_albummid(self, cloudmusic_albumid: int | str) -> str | None:
+        return self._query_one(
+            'SELECT qqmusic_albummid FROM album_map WHERE cloudmusic_albumid = ?', int(cloudmusic_albumid)
+        )
+
+    def resolve_cloudmusic(self, qqmusic_songmid: str, **kwargs) -> CloudMusicSongDetail | None:
+        """根据 QQ 音乐的 songmid，直接从网易云音乐获取对应歌曲的详细信息。
+
+        Args:
+            qqmusic_songmid (str): QQ 音乐的歌曲 mID
+            **kwargs: 传递给 ``cloudmusic.details()`` 的其他参数
+        Raises:
+            requests.RequestException: 网络、远端相关错误
+
+        没有记录对应关系时，返回 ``None``，且不会发出网络请求。
+        """
+        songid = self.cloudmusic_songid(qqmusic_songmid)
+        if songid is not None:
+            ret = cloudmusic.details(songid, **kwargs)
+            if len(ret) != 0:
+                return ret[0]
+
+    def resolve_qqmusic(self, cloudmusic_songid: int | str, **kwargs) -> QQMusicSongDetail | None:
+        """根据网易云音乐的 songid，直接从 QQ 音乐获取对应歌曲的详细信息。
+
+        Args:
+            cloudmusic_songid (int | str): 网易云音乐的歌曲 ID
+            **kwargs: 传递给 ``qqmusic.details()`` 的其他参数
+        Raises:
+            requests.RequestException: 网络、远端相关错误
+
+        没有记录对应关系时，返回 ``None``，且不会发出网络请求。
+        """
+        songmid = self.qqmusic_songmid(cloudmusic_songid)
+        if songmid is not None:
+            ret = qqmusic.details(songmid, **kwargs)
+            if len(ret) != 0:
+                return ret[0]
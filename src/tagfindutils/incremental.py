@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from functools import partial
+from hashlib import blake2b, sha1
+from os import PathLike
+from threading import Lock
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Sequence
+
+from .normalize import normalize_keywords
+from .serialization import decode, encode
+from .structures import SearchResult, SongDetail
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    row_key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    source TEXT NOT NULL,
+    songid TEXT,
+    payload BLOB,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS file_hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+"""
+
+# 这些参数只影响请求的发出方式，不影响搜索结果，因此不计入指纹
+_NEUTRAL_SEARCH_KWARGS = frozenset(('timeout', 'hedge', 'cached'))
+
+
+class LibraryRow(NamedTuple):
+    """批量查询中的一行：行的唯一标识、用于搜索的关键词，以及可选的音频文件路径。"""
+    key: str
+    keywords: Sequence[str]
+    path: str | PathLike | None = None
+
+
+class IncrementalResult(NamedTuple):
+    """批量查询中一行的结果；``changed`` 为否表示结果直接取自清单，没有发出网络请求。"""
+    key: str
+    detail: SongDetail | None
+    changed: bool
+
+
+def _pick_first(results: list[SearchResult]) -> SearchResult | None:
+    if results:
+        return results[0]
+
+
+def _callable_name(func: Callable) -> str:
+    # functools.partial 和实现了 __call__ 的实例没有 __qualname__，此时使用其底层函数或类型的名称
+    while isinstance(func, partial):
+        func = func.func
+    module = getattr(func, '__module__', None) or type(func).__module__
+    qualname = getattr(func, '__qualname__', None) or type(func).__qualname__
+    return f'{module}.{qualname}'
+
+
+class Manifest:
+    """记录每一行输入的指纹及其解析结果的清单，保存在 SQLite 数据库中。
+
+    解析结果以 ``serialization.encode()`` 的格式保存，因此无需网络请求即可还原；
+    文件哈希会按 (路径, 大小, 修改时间) 缓存，文件未变化时不会重新读取文件内容。
+
+    Args:
+        path (str | PathLike): 数据库文件的路径；默认为 ``':memory:'``（不持久化）
+    """
+
+    def __init__(self, path: str | PathLike = ':memory:') -> None:
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> Manifest:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def file_hash(self, path: str | PathLike) -> str:
+        """计算文件内容的哈希；文件的大小和修改时间未变化时，直接使用上次的结果。
+
+        Raises:
+            OSError: 无法读取文件
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT digest FROM file_hashes WHERE path = ? AND size = ? AND mtime_ns = ?',
+                (path, stat.st_size, stat.st_mtime_ns)
+            ).fetchone()
+        if row:
+            return row[0]
+
+        hasher = blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)',
+                (path, stat.st_size, stat.st_mtime_ns, digest)
+            )
+
+        return digest
+
+    def fingerprint(self, row: LibraryRow, params: Any = None) -> str:
+        """计算一行输入的指纹：规范化后的关键词、文件内容的哈希（如果提供了文件路径），
+        以及影响解析结果的其他参数 ``params``（须可 JSON 序列化）。
+        """
+        parts = [list(normalize_keywords(*row.keywords)), params]
+        if row.path is not None:
+            parts.append(self.file_hash(row.path))
+        return sha1(json.dumps(parts, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get(self, row_key: str) -> tuple[str, str, str | None, bytes | None] | None:
+        """返回 (指纹, 来源, 歌曲 ID, 编码后的详细信息)；没有记录时返回 ``None``。"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT fingerprint, source, songid, payload FROM entries WHERE row_key = ?', (row_key,)
+            ).fetchone()
+
+    def put(self, row_key: str, fingerprint: str, source: str, detail: SongDetail | None) -> None:
+        songid = None
+        payload = None
+        if detail is not None:
+            songid = getattr(detail, 'songmid', None) or detail.songid
+            songid = None if songid is None else str(songid)
+            payload = encode(detail)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)',
+                (row_key, fingerprint, source, songid, payload, time.time())
+            )
+
+    def remove(self, row_key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM entries WHERE row_key = ?', (row_key,))
+
+
+def lookup_incremental(rows: Iterable[LibraryRow | tuple],
+                       manifest: Manifest,
+                       source: str = 'cloudmusic',
+                       choose: Callable[[list[SearchResult]], SearchResult | None] = _pick_first,
+                       retry_misses: bool = False,
+                       version: str = '',
+                       **search_kwargs
+                       ) -> Iterator[IncrementalResult]:
+    """增量地批量查询：只有新增或发生变化的行才会调用 ``search()`` 和 ``details()``。
+
+    每一行的指纹由规范化后的关键词、（可选的）文件内容哈希，以及 ``search_kwargs``、
+    ``choose`` 的名称和 ``version`` 组成；其中 ``timeout`` 等不影响搜索结果的参数不计入指纹。
+    指纹和来源与清单中的记录相同的行，其结果直接从清单中还原，不发出任何网络请求。
+
+    Args:
+        rows: 多行输入，每行为 ``LibraryRow`` 或同样结构的元组
+        manifest (Manifest): 保存指纹和解析结果的清单
+        source (str): 搜索来源，可选值见 ``supported_sources()``；默认为 ``'cloudmusic'``
+        choose: 从搜索结果中选出匹配项的函数；默认选择第一项
+        retry_misses (bool): 对上次没有找到匹配项的未变化行重新搜索；默认为否
+        version (str): 计入指纹的任意字符串；修改 ``choose`` 的实现等清单无法察觉的变化时，
+            可以修改此值，使所有行重新查询。默认为空字符串
+        **search_kwargs: 传递给 ``search()`` 的其他参数
+    Raises:
+        ValueError: 为参数 ``source`` 指定了不支持的值
+        OSError: 无法读取某一行的文件
+        requests.RequestException: 网络、远端相关错误
+
+    结果按输入顺序逐行产出，且每处理完一行就写入清单，因此中断后重新运行时，已处理的行不会被重复查询。
+    """
+    from . import supported_sources
+
+    sources = supported_sources()
+    if source not in sources:
+        raise ValueError(f'不支持的搜索来源：{repr(source)}')
+    search = sources[source]
+    params = {
+        'search': {k: v for k, v in search_kwargs.items() if k not in _NEUTRAL_SEARCH_KWARGS},
+        'choose': _callable_name(choose),
+        'version': version
+    }
+
+    for row in rows:
+        row = LibraryRow(*row)
+        fingerprint = manifest.fingerprint(row, params)
+        entry = manifest.get(row.key)
+        if entry is not None and entry[0] == fingerprint and entry[1] == source:
+            if entry[3] is not None:
+                yield IncrementalResult(row.key, decode(entry[3]), False)
+                continue
+            if not retry_misses:
+                yield IncrementalResult(row.key, None, False)
+                continue
+
+        matched = choose(search(*row.keywords, **search_kwargs))
+        detail = matched.get_detail() if matched is not None else None
+        manifest.put(row.key, fingerprint, source, detail)
+        yield IncrementalResult(row.key, detail, True)
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import json
+import math
+import sqlite3
+from os import PathLike
+from threading import Lock
+from typing import Iterable
+
+from .cloudmusic import CloudMusicSearchResult, CloudMusicSongDetail
+from .normalize import canonical_key
+from .qqmusic import QQMusicSearchResult, QQMusicSongDetail
+from .structures import SearchResult
+from .utils import result_hooks
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS grams (
+    gram TEXT NOT NULL,
+    doc INTEGER NOT NULL,
+    PRIMARY KEY (gram, doc)
+) WITHOUT ROWID;
+"""
+
+
+def _index_grams(*texts: str) -> set[str]:
+    # 对每个词取所有一元组、二元组和三元组，使不足三个字符的查询词也能匹配到较长的词
+    ret = set()
+    for text in texts:
+        for token in canonical_key(text).split():
+            for n in (1, 2, 3):
+                ret.update(token[i:i + n] for i in range(len(token) - n + 1))
+
+    return ret
+
+
+def _query_grams(*keywords: str) -> set[str]:
+    # 对每个词取所有三元组；不足三个字符的词整体作为一项（即一元组或二元组）
+    ret = set()
+    for keyword in keywords:
+        for token in canonical_key(keyword).split():
+            if len(token) < 3:
+                ret.add(token)
+            else:
+                ret.update(token[i:i + 3] for i in range(len(token) - 2))
+
+    return ret
+
+
+def _to_record(result: SearchResult) -> tuple[str, str, int | str | None, dict] | None:
+    if isinstance(result, CloudMusicSongDetail):
+        return 'cloudmusic', 'detail', result.songid, result._raw_result
+    if isinstance(result, CloudMusicSearchResult):
+        return 'cloudmusic', 'search', result.songid, result._raw_result
+    if isinstance(result, QQMusicSongDetail):
+        raw = {
+            'data': {
+                'track_info': result._track_info,
+                'extras': result._extra_info,
+                'info': result._misc_info
+            }
+        }
+        return 'qqmusic', 'detail', result.songmid, raw
+    if isinstance(result, QQMusicSearchResult):
+        return 'qqmusic', 'search', result.songmid, result._raw_result
+
+
+_RESULT_TYPES = {
+    ('cloudmusic', 'detail'): CloudMusicSongDetail,
+    ('cloudmusic', 'search'): CloudMusicSearchResult,
+    ('qqmusic', 'detail'): QQMusicSongDetail,
+    ('qqmusic', 'search'): QQMusicSearchResult
+}
+
+
+class LocalIndex:
+    """在本地磁盘上保存已获取过的歌曲信息，并建立 n 元组倒排索引，以便离线搜索。
+
+    索引覆盖歌名、别名、翻译名、歌手和专辑名，所有文本都先经过 ``normalize.canonical_key()`` 规范化。
+    查询时较长的词按三元组匹配，不足三个字符的词（如“来る”“ai”）按一元组或二元组匹配。
+    同一首歌曲的详细信息会取代其搜索结果，反之则不会。
+
+    调用 ``attach()`` 后，本库之后从网络获取的所有搜索结果和详细信息都会被自动加入索引。
+
+    Args:
+        path (str | PathLike): 数据库文件的路径；默认为 ``':memory:'``（不持久化）
+        min_score (float): 判定为命中所需的查询 n 元组匹配比例（0~1），默认为 1（全部匹配）
+    """
+
+    def __init__(self, path: str | PathLike = ':memory:', min_score: float = 1.0) -> None:
+        self.min_score = min_score
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.detach()
+        self._conn.close()
+
+    def __enter__(self) -> LocalIndex:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM docs').fetchone()[0]
+
+    def attach(self) -> None:
+        """开始自动将本库从网络获取的结果加入索引。"""
+        if self.add not in result_hooks:
+            result_hooks.append(self.add)
+
+    def detach(self) -> None:
+        """停止自动将本库从网络获取的结果加入索引。"""
+        if self.add in result_hooks:
+            result_hooks.remove(self.add)
+
+    def add(self, results: Iterable[SearchResult]) -> None:
+        """将搜索结果或详细信息加入索引；缺少 ID 或类型不受支持的结果会被跳过。"""
+        with self._lock, self._conn:
+            for result in results:
+                record = _to_record(result)
+                if record is None or record[2] is None or record[2] == '':
+                    continue
+                source, kind, songid, raw = record
+                key = f'{source}:{songid}'
+                row = self._conn.execute('SELECT id, kind FROM docs WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    if kind == 'search' and row[1] == 'detail':
+                        continue
+                    self._conn.execute('DELETE FROM grams WHERE doc = ?', (row[0],))
+                    self._conn.execute('DELETE FROM docs WHERE id = ?', (row[0],))
+
+                cursor = self._conn.execute(
+                    'INSERT INTO docs (key, source, kind, payload) VALUES (?, ?, ?, ?)',
+                    (key, source, kind, json.dumps(raw, ensure_ascii=False, separators=(',', ':')))
+                )
+                grams = _index_grams(result.songname or '',
+                                     result.album or '',
+                                     *result.aliases,
+                                     *result.translations,
+                                     *result.artists)
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO grams VALUES (?, ?)',
+                    ((gram, cursor.lastrowid) for gram in grams)
+                )
+
+    def lookup(self, *keywords: str, source: str | None = None, limit: int = 10) -> list[SearchResult]:
+        """只在本地索引中搜索，按匹配程度从高到低返回结果。
+
+        Args:
+            keywords (str): 关键词
+            source (str | None): 只返回指定来源的结果；默认不限制
+            limit (int): 最多返回的结果数量，默认为 10
+        """
+        grams = _query_grams(*keywords)
+        if not grams:
+            return []
+        need = max(1, math.ceil(len(grams) * self.min_score))
+        sql = (
+            'SELECT docs.source, docs.kind, docs.payload, COUNT(*) AS score '
+            'FROM grams JOIN docs ON docs.id = grams.doc '
+            f'WHERE grams.gram IN ({",".join("?" * len(grams))}) '
+        )
+        params: list = list(grams)
+        if source is not None:
+            sql += 'AND docs.source = ? '
+            params.append(source)
+        sql += 'GROUP BY grams.doc HAVING score >= ? ORDER BY score DESC, docs.kind ASC LIMIT ?'
+        params.extend((need, limit))
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [_RESULT_TYPES[(row[0], row[1])](json.loads(row[2])) for row in rows]
+
+    def search(self,
+               *keywords: str,
+               source: str = 'cloudmusic',
+               limit: int = 10,
+               **search_kwargs
+               ) -> list[SearchResult]:
+        """本地优先的搜索：本地索引命中时直接返回，未命中时才通过网络搜索。
+
+        Args:
+            keywords (str): 关键词
+            source (str): 搜索来源，可选值见 ``supported_sources()``；默认为 ``'cloudmusic'``
+            limit (int): 本地命中时最多返回的结果数量，默认为 10
+            **search_kwargs: 未命中时传递给 ``search()`` 的其他参数
+        Raises:
+            ValueError: 为参数 ``source`` 指定了不支持的值
+            requests.RequestException: 网络、远端相关错误
+
+        通过网络获取的结果会被加入索引。
+        """
+        from . import supported_sources
+
+        sources = supported_sources()
+        if source not in sources:
+            raise ValueError(f'不支持的搜索来源：{repr(source)}')
+
+        ret = self.lookup(*keywords, source=source, limit=limit)
+        if ret:
+            return ret
+
+        ret = sources[source](*keywords, **search_kwargs)
+        if self.add not in result_hooks:
+            self.add(ret)
+        return ret
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from functools import lru_cache
+
+FOLD_CHINESE: bool = False
+"""是否默认将繁体中文转换为简体中文；需要安装可选依赖 ``opencc``。"""
+
+# NFKC 之后全角括号已被折叠为半角，此处只需处理半角括号和 NFKC 不会折叠的括号
+_BRACKETED = re.compile(r'\([^()]*\)|\[[^\[\]]*]|\{[^{}]*}|【[^【】]*】|〔[^〔〕]*〕')
+# 只有内容包含这些标记词的括号才会被去除，歌名本身的括号（如“(I Can't Get No) Satisfaction”）会被保留
+_TAG_WORDS = re.compile(
+    r'(?<![a-z])(?:live|mv|pv|remix|mix|feat|ft|ver|version|edit|remaster(?:ed)?|'
+    r'inst|instrumental|off vocal|acoustic|cover|tv size|short|demo|explicit)(?![a-z])|'
+    r'现场|現場|伴奏|纯音乐|純音樂|翻唱|版',
+    re.IGNORECASE
+)
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=1)
+def _get_t2s_converter():
+    try:
+        import opencc
+    except ImportError as exc:
+        raise ImportError('繁简转换需要安装可选依赖 opencc：pip install opencc-python-reimplemented') from exc
+    return opencc.OpenCC('t2s')
+
+
+def _collapse(text: str) -> str:
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def _strip_tag(match: re.Match) -> str:
+    if _TAG_WORDS.search(match.group()[1:-1]):
+        return ' '
+    return match.group()
+
+
+@lru_cache(maxsize=4096)
+def _normalize_keyword(keyword: str, fold_chinese: bool) -> str:
+    text = unicodedata.normalize('NFKC', keyword)
+    stripped = _collapse(_BRACKETED.sub(_strip_tag, text))
+    # 整个关键词都在括号中时，保留括号内的内容
+    text = stripped if stripped else _collapse(text)
+    if fold_chinese:
+        text = _get_t2s_converter().convert(text)
+
+    return text
+
+
+def normalize_keywords(*keywords: str, fold_chinese: bool | None = None) -> tuple[str, ...]:
+    """将关键词规范化为适合发送到搜索接口的形式。
+
+    依次进行：NFKC 规范化（同时折叠全角/半角字符）、去除内容为版本标记的括号（如“(Live)”“【MV】”“(feat. XXX)”）、
+    合并空白字符，以及可选的繁简转换。结果会被缓存。
+
+    Args:
+        keywords (str): 关键词
+        fold_chinese (bool | None): 是否将繁体中文转换为简体中文；
+            默认为 ``None``（使用模块属性 ``FOLD_CHINESE`` 的值）
+    Raises:
+        ImportError: 需要繁简转换，但未安装 ``opencc``
+    """
+    if fold_chinese is None:
+        fold_chinese = FOLD_CHINESE
+
+    ret = []
+    for keyword in keywords:
+        normalized = _normalize_keyword(keyword, fold_chinese)
+        if normalized:
+            ret.append(normalized)
+
+    return tuple(ret)
+
+
+@lru_cache(maxsize=4096)
+def _canonicalize(normalized: str) -> str:
+    chars = []
+    for char in normalized.casefold():
+        if unicodedata.category(char)[0] in 'PSZ':
+            chars.append(' ')
+        else:
+            chars.append(char)
+    ret = _collapse(''.join(chars))
+
+    # 关键词只由标点和符号组成（如“!!!”“♪”）时，保留这些字符，避免所有此类关键词得到相同的空键
+    return ret if ret else _collapse(normalized.casefold())
+
+
+def canonical_key(*keywords: str, fold_chinese: bool | None = None) -> str:
+    """根据关键词生成规范键，用于缓存查找和请求去重。
+
+    在 ``normalize_keywords()`` 的基础上，再进行大小写折叠并去除标点和符号。
+    仅在大小写、全角/半角、标点、括号标记上有差异的关键词，会得到相同的规范键；
+    只由标点和符号组成的关键词则保留这些字符。
+
+    Args:
+        keywords (str): 关键词
+        fold_chinese (bool | None): 是否将繁体中文转换为简体中文；
+            默认为 ``None``（使用模块属性 ``FOLD_CHINESE`` 的值）
+    """
+    return _canonicalize(' '.join(normalize_keywords(*keywords, fold_chinese=fold_chinese)))
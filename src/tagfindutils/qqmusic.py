@@ -2,12 +2,93 @@ from __future__ import annotations
 
 from copy import deepcopy as dp
 from datetime import datetime
+from itertools import zip_longest
+from typing import Any, Sequence
 
 import requests
 
-from .rawquery import get_details_from_qqmusic, get_search_results_from_qqmusic
-from .structures import SearchResult, SongDetail
-from .utils import type_filter
+from .cache import DetailCache, search_cache
+from .circuitbreaker import breakers
+from .normalize import canonical_key, normalize_keywords
+from .rawquery import (get_album_details_from_qqmusic,
+                       get_batch_search_results_from_qqmusic,
+                       get_details_from_qqmusic,
+                       get_search_results_from_qqmusic)
+from .structures import AlbumSearchResult, SearchResult, SongDetail, _LazyRaw
+from .transport import deadline
+from .utils import notify_results, type_filter
+
+_NoneType = type(None)
+
+
+def _singers_from_dict(data: dict[str, Any]) -> list[dict[str, str | int | None]]:
+    ret = []
+    for name, singerid, singermid in zip_longest(data.get('artists') or [],
+                                                 data.get('artistids') or [],
+                                                 data.get('artistmids') or []):
+        ret.append({'name': name, 'id': singerid, 'mid': singermid})
+
+    return ret
+
+
+def _info_contents_from_values(values: list[str] | None) -> dict[str, list[dict[str, str]]] | None:
+    if values:
+        return {'content': [{'value': _} for _ in values]}
+
+
+def _singer_values(singers: Any) -> tuple[list[str], list[int], list[str]] | None:
+    # 一次遍历歌手列表，得到 (artists, artistids, artistmids)；遇到类型不符的值时返回 None
+    if not isinstance(singers, (list, _NoneType)):
+        return None
+    names = []
+    ids = []
+    mids = []
+    if singers:
+        for item in singers:
+            if not isinstance(item, dict):
+                return None
+            name = item.get('name')
+            singerid = item.get('id')
+            singermid = item.get('mid')
+            if not (isinstance(name, (str, _NoneType)) and isinstance(singerid, (int, _NoneType))
+                    and isinstance(singermid, (str, _NoneType))):
+                return None
+            if name:
+                names.append(name)
+            if singerid:
+                ids.append(singerid)
+            if singermid:
+                mids.append(singermid)
+
+    return names, ids, mids
+
+
+def _info_values(misc_info: dict[str, Any], key: str) -> list[str] | None:
+    # 一次遍历 info 中的 genre/company 等条目，得到其中的非空值；遇到类型不符的值时返回 None
+    info = misc_info.get(key)
+    if not isinstance(info, (dict, _NoneType)):
+        return None
+    ret = []
+    if info:
+        contents = info.get('content')
+        if not isinstance(contents, (list, _NoneType)):
+            return None
+        if contents:
+            for item in contents:
+                if not isinstance(item, dict):
+                    return None
+                value = item.get('value')
+                if not isinstance(value, (str, _NoneType)):
+                    return None
+                if value:
+                    ret.append(value)
+
+    return ret
+
+
+def _coverurl_from_albummid(albummid: str | None) -> str | None:
+    if albummid:
+        return f'https://y.qq.com/music/photo_new/T002R800x800M000{albummid}.jpg'
 
 
 class QQMusicSongDetail(SongDetail):
@@ -18,6 +99,95 @@ class QQMusicSongDetail(SongDetail):
         self._extra_info: dict[str, str] | None = raw_result_data.get('extras')
         self._misc_info: dict[str, dict[str, str | list]] | None = raw_result_data.get('info')
 
+    _fields = SongDetail._fields + ('songmid', 'albummid', 'artistmids')
+    _track_info = _LazyRaw()
+    _extra_info = _LazyRaw()
+    _misc_info = _LazyRaw()
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> QQMusicSongDetail:
+        publish_time = cls._publish_time_from_dict(data)
+        aliases = data.get('aliases') or []
+        translations = data.get('translations') or []
+        track_info = {
+            'name': data.get('songname'),
+            'id': data.get('songid'),
+            'mid': data.get('songmid'),
+            'album': {
+                'name': data.get('album'),
+                'id': data.get('albumid'),
+                'mid': data.get('albummid')
+            },
+            'singer': _singers_from_dict(data),
+            'subtitle': aliases[0] if aliases else None,
+            'time_public': None if publish_time is None else publish_time.isoformat()
+        }
+        extra_info = {
+            'transname': translations[0] if translations else None
+        }
+        misc_info = {
+            'genre': _info_contents_from_values(data.get('genre')),
+            'company': _info_contents_from_values(data.get('company'))
+        }
+        return cls._from_raw(_track_info=track_info, _extra_info=extra_info, _misc_info=misc_info)
+
+    def _values_from_raw(self) -> list | None:
+        track_info = self._track_info
+        extra_info = self._extra_info
+        misc_info = self._misc_info
+        songname = songid = songmid = album = albumid = albummid = pub_time_str = None
+        aliases = []
+        translations = []
+        singers = ([], [], [])
+        genre = []
+        company = []
+        if track_info:
+            if not isinstance(track_info, dict):
+                return None
+            songname = track_info.get('name')
+            songid = track_info.get('id')
+            songmid = track_info.get('mid')
+            alb = track_info.get('album')
+            subtitle = track_info.get('subtitle')
+            pub_time_str = track_info.get('time_public')
+            if not (isinstance(songname, (str, _NoneType)) and isinstance(songid, (int, _NoneType))
+                    and isinstance(songmid, (str, _NoneType)) and isinstance(alb, (dict, _NoneType))
+                    and isinstance(subtitle, (str, _NoneType)) and isinstance(pub_time_str, (str, _NoneType))):
+                return None
+            if alb:
+                album = alb.get('name')
+                albumid = alb.get('id')
+                albummid = alb.get('mid')
+                if not (isinstance(album, (str, _NoneType)) and isinstance(albumid, (int, _NoneType))
+                        and isinstance(albummid, (str, _NoneType))):
+                    return None
+            if subtitle:
+                aliases.append(subtitle)
+            singers = _singer_values(track_info.get('singer'))
+            if singers is None:
+                return None
+        if extra_info:
+            if not isinstance(extra_info, dict):
+                return None
+            transname = extra_info.get('transname')
+            if not isinstance(transname, (str, _NoneType)):
+                return None
+            if transname:
+                translations.append(transname)
+        if misc_info:
+            if not isinstance(misc_info, dict):
+                return None
+            genre = _info_values(misc_info, 'genre')
+            company = _info_values(misc_info, 'company')
+            if genre is None or company is None:
+                return None
+            company = [_ for _ in company if _ != '制作家']
+        # 所有类型检查通过之后才解析日期，使解析失败时引发的异常与通过属性读取时相同
+        publish_time = datetime.fromisoformat(pub_time_str) if pub_time_str else None
+
+        return [songname, songid, album, albumid, aliases, translations, singers[0], singers[1],
+                _coverurl_from_albummid(albummid), publish_time, genre, company, songmid, albummid, singers[2]]
+
     @property
     def album(self) -> str | None:
         if self._track_info:
@@ -166,6 +336,48 @@ class QQMusicSearchResult(SearchResult):
     def __init__(self, raw_result: dict[str, str | int | list | dict]) -> None:
         self._raw_result = dp(raw_result)
 
+    _fields = SearchResult._fields + ('songmid', 'albummid', 'artistmids')
+    _raw_result = _LazyRaw()
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> QQMusicSearchResult:
+        publish_time = cls._publish_time_from_dict(data)
+        raw_result = {
+            'songname': data.get('songname'),
+            'songid': data.get('songid'),
+            'songmid': data.get('songmid'),
+            'albumname': data.get('album'),
+            'albumid': data.get('albumid'),
+            'albummid': data.get('albummid'),
+            'singer': _singers_from_dict(data),
+            'lyric': '|'.join(data.get('aliases') or []),
+            'pubtime': None if publish_time is None else round(publish_time.timestamp())
+        }
+        return cls._from_raw(_raw_result=raw_result)
+
+    def _values_from_raw(self) -> list | None:
+        raw_result = self._raw_result
+        songname = raw_result.get('songname')
+        songid = raw_result.get('songid')
+        songmid = raw_result.get('songmid')
+        album = raw_result.get('albumname')
+        albumid = raw_result.get('albumid')
+        albummid = raw_result.get('albummid')
+        lyric_title = raw_result.get('lyric')
+        time_ms = raw_result.get('pubtime')
+        if not (isinstance(songname, (str, _NoneType)) and isinstance(songid, (int, _NoneType))
+                and isinstance(songmid, (str, _NoneType)) and isinstance(album, (str, _NoneType))
+                and isinstance(albumid, (int, _NoneType)) and isinstance(albummid, (str, _NoneType))
+                and isinstance(lyric_title, (str, _NoneType)) and isinstance(time_ms, (int, _NoneType))):
+            return None
+        singers = _singer_values(raw_result.get('singer'))
+        if singers is None:
+            return None
+
+        return [songname, songid, album, albumid, lyric_title.split('|') if lyric_title else [], [],
+                singers[0], singers[1], _coverurl_from_albummid(albummid),
+                datetime.fromtimestamp(time_ms) if time_ms else None, songmid, albummid, singers[2]]
+
     @property
     def album(self) -> str | None:
         return self.type_filter(self._raw_result.get('albumname'), str)
@@ -258,9 +470,86 @@ class QQMusicSearchResult(SearchResult):
                 return ret[0]
 
 
+class QQMusicAlbumSearchResult(AlbumSearchResult):
+    def __init__(self, raw_result: dict[str, str | int | list | dict]) -> None:
+        self._raw_result = dp(raw_result)
+
+    @property
+    def album(self) -> str | None:
+        return self.type_filter(self._raw_result.get('albumName'), str)
+
+    @property
+    def albumid(self) -> int | None:
+        return self.type_filter(self._raw_result.get('albumID'), int)
+
+    @property
+    def albummid(self) -> str | None:
+        return self.type_filter(self._raw_result.get('albumMID'), str)
+
+    @property
+    def artists(self) -> list[str]:
+        singers: list[dict[str, str | int]] | None = self.type_filter(self._raw_result.get('singer_list'), list)
+        ret: list[str] = []
+        if singers:
+            for item in singers:
+                singername = self.type_filter(item.get('name'), str)
+                if singername:
+                    ret.append(singername)
+
+        return ret
+
+    @property
+    def artistids(self) -> list[int]:
+        singers: list[dict[str, str | int]] | None = self.type_filter(self._raw_result.get('singer_list'), list)
+        ret: list[int] = []
+        if singers:
+            for item in singers:
+                singerid = self.type_filter(item.get('id'), int)
+                if singerid:
+                    ret.append(singerid)
+
+        return ret
+
+    @property
+    def artistmids(self) -> list[str]:
+        singers: list[dict[str, str | int]] | None = self.type_filter(self._raw_result.get('singer_list'), list)
+        ret: list[str] = []
+        if singers:
+            for item in singers:
+                singermid = self.type_filter(item.get('mid'), str)
+                if singermid:
+                    ret.append(singermid)
+
+        return ret
+
+    @property
+    def coverurl(self) -> str | None:
+        albummid = self.type_filter(self.albummid, str)
+        if albummid:
+            return f'https://y.qq.com/music/photo_new/T002R800x800M000{albummid}.jpg'
+
+    @property
+    def publish_time(self) -> datetime | None:
+        pub_time_str = self.type_filter(self._raw_result.get('publicTime'), str)
+        if pub_time_str:
+            return datetime.fromisoformat(pub_time_str)
+
+    @property
+    def track_count(self) -> int | None:
+        return self.type_filter(self._raw_result.get('song_count'), int)
+
+    def get_tracklist(self) -> list[QQMusicSongDetail]:
+        if self.albummid:
+            return album_details(self.albummid)
+        return []
+
+
 def search(*keywords: str,
            result_pageidx: int = 0,
            result_size: int = 10,
+           timeout: float | None = None,
+           hedge: float | None = None,
+           cached: bool = False
            ) -> list[QQMusicSearchResult]:
     """根据关键词，从 QQ 音乐获取匹配关键词的歌曲的信息。
 
@@ -268,10 +557,31 @@ def search(*keywords: str,
         keywords (str): 关键词
         result_pageidx (int): 搜索结果的所在的页码，默认为 0
         result_size (int): 搜索结果的数量，默认为 10
+        timeout (float | None): 本次调用的截止时间（秒），默认不限制
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100），默认不发出对冲请求
+        cached (bool): 规范化关键词，并通过 ``cache.search_cache`` 缓存和合并请求；
+            规范键相同的搜索只会发出一次网络请求。默认为否
     Raises:
         requests.RequestException: 网络、远端相关错误
     """
-    _full_result = get_search_results_from_qqmusic(*keywords, result_pageidx=result_pageidx, result_size=result_size)
+    if cached:
+        key = ('qqmusic', canonical_key(*keywords), result_pageidx, result_size)
+        return list(
+            search_cache.get_or_fetch(
+                key,
+                lambda: search(*normalize_keywords(*keywords),
+                               result_pageidx=result_pageidx,
+                               result_size=result_size,
+                               timeout=timeout,
+                               hedge=hedge)
+            )
+        )
+
+    _full_result = get_search_results_from_qqmusic(*keywords,
+                                                   result_pageidx=result_pageidx,
+                                                   result_size=result_size,
+                                                   timeout=timeout,
+                                                   hedge=hedge)
     if isinstance(_full_result, requests.Response):
         full_result: dict = _full_result.json()
     else:
@@ -282,16 +592,120 @@ def search(*keywords: str,
         for item in raw_results:
             ret.append(QQMusicSearchResult(item))
 
+    notify_results(ret)
     return ret
 
 
-def details(*songmids: str) -> list[QQMusicSongDetail]:
+def _musicu_item_to_search_result(item: dict[str, str | int | list | dict]) -> QQMusicSearchResult:
+    # musicu.fcg 搜索接口返回的字段与 client_search_cp 不同，此处转换为后者的格式
+    alb: dict[str, str | int] = item.get('album') or {}
+    pubtime = None
+    pub_time_str = type_filter(item.get('time_public'), str)
+    if pub_time_str:
+        pubtime = int(datetime.fromisoformat(pub_time_str).timestamp())
+
+    return QQMusicSearchResult(
+        {
+            'songname': item.get('name'),
+            'songid': item.get('id'),
+            'songmid': item.get('mid'),
+            'albumname': alb.get('name'),
+            'albumid': alb.get('id'),
+            'albummid': alb.get('mid'),
+            'singer': item.get('singer'),
+            'lyric': item.get('lyric'),
+            'pubtime': pubtime
+        }
+    )
+
+
+def search_many(queries: Sequence[str | Sequence[str]],
+                result_pageidx: int = 0,
+                result_size: int = 10,
+                batch_size: int = 20,
+                timeout: float | None = None,
+                hedge: float | None = None,
+                return_exceptions: bool = False
+                ) -> list[list[QQMusicSearchResult] | requests.RequestException]:
+    """将多个互相独立的查询打包到少量 musicu.fcg 请求中，从 QQ 音乐批量获取匹配的歌曲的信息。
+
+    Args:
+        queries: 多个查询；每个查询为一个关键词，或一组关键词
+        result_pageidx (int): 搜索结果的所在的页码，默认为 0
+        result_size (int): 每个查询的搜索结果的数量，默认为 10
+        batch_size (int): 每个请求最多包含的查询数量，默认为 20
+        timeout (float | None): 本次调用的截止时间（秒），由所有请求共享；默认不限制
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100），默认不发出对冲请求
+        return_exceptions (bool): 远端对某个查询返回错误时，将异常作为该查询的结果返回，
+            而不是中止整个调用；默认为否
+    Raises:
+        requests.RequestException: 网络、远端相关错误（包括远端对某个查询返回错误，``return_exceptions`` 为否时）
+
+    返回的列表与 ``queries`` 一一对应；没有匹配的歌曲时，该查询的结果为空列表。
+    整个请求被接口拒绝（响应中没有任何查询的结果）时，会计入 QQ 音乐熔断器的失败次数。
+    """
+    all_keywords = [(query,) if isinstance(query, str) else tuple(query) for query in queries]
+    ret: list[list[QQMusicSearchResult] | requests.RequestException] = []
+    with deadline(timeout):
+        for start in range(0, len(all_keywords), batch_size):
+            batch = all_keywords[start:start + batch_size]
+            full_result: dict = get_batch_search_results_from_qqmusic(*batch,
+                                                                      result_pageidx=result_pageidx,
+                                                                      result_size=result_size,
+                                                                      hedge=hedge)
+            if not any(f'req_{idx}' in full_result for idx in range(len(batch))):
+                # HTTP 状态码为 200，send() 不会将其视为失败，需要在此记录
+                breaker = breakers.get('qqmusic')
+                if breaker is not None:
+                    breaker.record_failure()
+                exc = requests.RequestException(
+                    f"QQ 音乐拒绝了批量搜索请求：code={repr(full_result.get('code'))}"
+                )
+                if not return_exceptions:
+                    raise exc
+                ret.extend(exc for _ in batch)
+                continue
+
+            for idx, keywords in enumerate(batch):
+                sub_result: dict = full_result.get(f'req_{idx}') or {}
+                if sub_result.get('code') != 0:
+                    exc = requests.RequestException(
+                        f"QQ 音乐对查询 {repr(' '.join(keywords))} 返回了错误：code={repr(sub_result.get('code'))}"
+                    )
+                    if not return_exceptions:
+                        raise exc
+                    ret.append(exc)
+                    continue
+                results = []
+                raw_results: list[dict] = sub_result['data']['body']['song']['list']
+                for item in raw_results:
+                    results.append(_musicu_item_to_search_result(item))
+                notify_results(results)
+                ret.append(results)
+
+    return ret
+
+
+def details(*songmids: str,
+            timeout: float | None = None,
+            hedge: float | None = None,
+            cached: bool = False
+            ) -> list[QQMusicSongDetail]:
     """根据一个或多个 songmid 从 QQ 音乐获取一首/多首歌曲的详细信息。
 
     Args:
         *songmids: 一个或多个歌曲 mID
+        timeout (float | None): 本次调用的截止时间（秒），默认不限制
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100），默认不发出对冲请求
+        cached (bool): 通过 ``detail_cache`` 获取详细信息：未过期的缓存直接返回，
+            过期的缓存先返回、再在后台刷新；默认为否
+    Raises:
+        requests.RequestException: 网络、远端相关错误
     """
-    _full_result = get_details_from_qqmusic(*songmids, raw_response=False)
+    if cached:
+        return detail_cache.get_many(*songmids, timeout=timeout, hedge=hedge)
+
+    _full_result = get_details_from_qqmusic(*songmids, raw_response=False, timeout=timeout, hedge=hedge)
     if isinstance(_full_result, requests.Response):
         full_result: dict = _full_result.json()
     else:
@@ -302,4 +716,68 @@ def details(*songmids: str) -> list[QQMusicSongDetail]:
         for item in raw_results:
             ret.append(QQMusicSongDetail(item['songinfo']))
 
+    notify_results(ret)
+    return ret
+
+
+detail_cache = DetailCache(fetch=details, key_of=lambda _: _.songmid, normalize_id=str)
+"""``details(..., cached=True)`` 使用的详细信息缓存。"""
+
+
+def search_albums(*keywords: str,
+                  result_pageidx: int = 0,
+                  result_size: int = 10,
+                  timeout: float | None = None,
+                  hedge: float | None = None
+                  ) -> list[QQMusicAlbumSearchResult]:
+    """根据关键词，从 QQ 音乐获取匹配关键词的专辑的信息。
+
+    Args:
+        keywords (str): 关键词
+        result_pageidx (int): 搜索结果的所在的页码，默认为 0
+        result_size (int): 搜索结果的数量，默认为 10
+        timeout (float | None): 本次调用的截止时间（秒），默认不限制
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100），默认不发出对冲请求
+    Raises:
+        requests.RequestException: 网络、远端相关错误
+    """
+    full_result: dict = get_search_results_from_qqmusic(*keywords,
+                                                        result_pageidx=result_pageidx,
+                                                        result_size=result_size,
+                                                        result_type=8,
+                                                        timeout=timeout,
+                                                        hedge=hedge)
+    ret = []
+    if full_result:
+        raw_results: list[dict] = full_result['data']['album']['list']
+        for item in raw_results:
+            ret.append(QQMusicAlbumSearchResult(item))
+
+    return ret
+
+
+def album_details(albummid: str,
+                  timeout: float | None = None,
+                  hedge: float | None = None
+                  ) -> list[QQMusicSongDetail]:
+    """根据专辑的 albummid，通过一次请求从 QQ 音乐获取专辑的完整曲目列表。
+
+    曲目列表接口不包含翻译名、流派和出版方，因此得到的详细信息中，
+    ``translations``、``genre``、``company`` 均为空列表；如有需要，请对单首歌曲调用 ``details()``。
+
+    Args:
+        albummid (str): 专辑 mID
+        timeout (float | None): 本次调用的截止时间（秒），默认不限制
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100），默认不发出对冲请求
+    Raises:
+        requests.RequestException: 网络、远端相关错误
+    """
+    full_result: dict = get_album_details_from_qqmusic(albummid, timeout=timeout, hedge=hedge)
+    ret = []
+    if full_result:
+        raw_results: list[dict] = full_result['albumSonglist']['data']['songList']
+        for item in raw_results:
+            ret.append(QQMusicSongDetail({'data': {'track_info': item['songInfo']}}))
+
+    notify_results(ret)
     return ret
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
 import json
+from typing import Sequence
 
 import requests
 
+from .transport import deadline, send
+
 
 def get_search_results_from_qqmusic(*keywords: str,
                                     result_pageidx: int = 0,
                                     result_size: int = 10,
                                     result_type: int = 0,
-                                    raw_response=False
+                                    raw_response=False,
+                                    timeout: float | None = None,
+                                    hedge: float | None = None
                                     ) -> dict | requests.Response:
     """从 QQ 音乐获取 歌曲/歌单/歌词/专辑/歌手/MV 的信息。
 
@@ -20,6 +25,8 @@ def get_search_results_from_qqmusic(*keywords: str,
         result_type (int): 搜索的类型
         raw_response (bool): 返回原始响应对象；
             默认为否（返回一个对结果进行 JSON 反序列化后得到的 dict）
+        timeout (float | None): 本次调用的截止时间（秒），默认不限制
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100），默认不发出对冲请求
     Raises:
         ValueError: 为参数 ``result_type`` 指定了不支持的值
         requests.RequestException: 网络、远端相关错误
@@ -60,7 +67,55 @@ def get_search_results_from_qqmusic(*keywords: str,
         'Referer': 'https://y.qq.com'
     }
 
-    resp = requests.get(url=url, headers=headers, params=params)
+    with deadline(timeout):
+        resp = send('GET', url, source='qqmusic', hedge=hedge, headers=headers, params=params)
+    resp.raise_for_status()
+    if raw_response:
+        return resp
+    return resp.json()
+
+
+def get_batch_search_results_from_qqmusic(*queries: Sequence[str],
+                                          result_pageidx: int = 0,
+                                          result_size: int = 10,
+                                          raw_response=False,
+                                          timeout: float | None = None,
+                                          hedge: float | None = None
+                                          ) -> dict | requests.Response:
+    """通过 QQ 音乐的 musicu.fcg 接口，在一次请求中搜索多组关键词对应的歌曲。
+
+    第 N 组关键词的结果位于返回的 dict 的 ``'req_N'`` 键中。
+
+    Args:
+        *queries: 一组或多组关键词
+        result_pageidx (int): 搜索结果的所在的页码，默认为 0
+        result_size (int): 每组关键词的搜索结果的数量，默认为 10
+        raw_response (bool): 返回原始响应对象；
+            默认为否（返回一个对结果进行 JSON 反序列化后得到的 dict）
+        timeout (float | None): 本次调用的截止时间（秒），默认不限制
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100），默认不发出对冲请求
+    Raises:
+        requests.RequestException: 网络、远端相关错误
+    """
+    url = 'http://u.y.qq.com/cgi-bin/musicu.fcg'
+    payload = {}
+    for idx, keywords in enumerate(queries):
+        payload[f'req_{idx}'] = {
+            'method': 'DoSearchForQQMusicDesktop',
+            'module': 'music.search.SearchCgiService',
+            'param': {
+                'query': ' '.join(keywords),
+                'num_per_page': result_size,
+                'page_num': result_pageidx + 1,
+                'search_type': 0
+            }
+        }
+    headers = {
+        'Referer': 'https://y.qq.com'
+    }
+
+    with deadline(timeout):
+        resp = send('POST', url, source='qqmusic', hedge=hedge, headers=headers, data=json.dumps(payload))
     resp.raise_for_status()
     if raw_response:
         return resp
@@ -71,7 +126,9 @@ def get_search_results_from_cloudmusic(*keywords: str,
                                        result_pageidx: int = 0,
                                        result_size: int = 10,
                                        result_type: int = 1,
-                                       raw_response=False
+                                       raw_response=False,
+                                       timeout: float | None = None,
+                                       hedge: float | None = None
                                        ) -> dict | requests.Response:
     """从网易云音乐获取 歌曲/专辑/歌手/歌单/用户/MV/歌词/电台 的信息。
 
@@ -82,6 +139,8 @@ def get_search_results_from_cloudmusic(*keywords: str,
         result_type (int): 搜索的类型
         raw_response (bool): 返回原始响应对象；
             默认为否（返回一个对结果进行 JSON 反序列化后得到的 dict）
+        timeout (float | None): 本次调用的截止时间（秒），默认不限制
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100），默认不发出对冲请求
     Raises:
         ValueError: 为参数 ``result_type`` 指定了不支持的值
         requests.RequestException: 网络、远端相关错误
@@ -110,7 +169,8 @@ def get_search_results_from_cloudmusic(*keywords: str,
         'total': True
     }
 
-    resp = requests.post(url=url, data=payload)
+    with deadline(timeout):
+        resp = send('POST', url, source='cloudmusic', hedge=hedge, data=payload)
     resp.raise_for_status()
     if raw_response:
         return resp
@@ -118,7 +178,9 @@ def get_search_results_from_cloudmusic(*keywords: str,
 
 
 def get_details_from_qqmusic(*songmids: str,
-                             raw_response=False
+                             raw_response=False,
+                             timeout: float | None = None,
+                             hedge: float | None = None
                              ) -> dict[str, list[dict]] | list[requests.Response]:
     """从 QQ 音乐获取一首/多首歌曲的详细信息。
 
@@ -129,6 +191,10 @@ def get_details_from_qqmusic(*songmids: str,
         *songmids: 一个或多个歌曲 ID
         raw_response (bool): 返回一个或多个原始响应对象；
             默认为否（返回一个或多个对结果进行 JSON 反序列化后得到的 dict）
+        timeout (float | None): 本次调用的截止时间（秒），由所有歌曲的查询共享；默认不限制
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100），默认不发出对冲请求
+    Raises:
+        requests.RequestException: 网络、远端相关错误
     """
     url = 'http://u.y.qq.com/cgi-bin/musicu.fcg'
 
@@ -147,17 +213,20 @@ def get_details_from_qqmusic(*songmids: str,
             )
         }
 
-        resp = requests.get(url=url, params=params)
+        resp = send('GET', url, source='qqmusic', hedge=hedge, params=params)
         resp.raise_for_status()
         return resp
 
-    if raw_response:
-        return [simple_query(_) for _ in songmids]
-    return {'songs': [simple_query(_).json() for _ in songmids]}
+    with deadline(timeout):
+        if raw_response:
+            return [simple_query(_) for _ in songmids]
+        return {'songs': [simple_query(_).json() for _ in songmids]}
 
 
 def get_details_from_cloudmusic(*songids: int | str,
-                                raw_response=False
+                                raw_response=False,
+                                timeout: float | None = None,
+                                hedge: float | None = None
                                 ) -> dict | requests.Response:
     """从网易云音乐获取一首/多首歌曲的详细信息。
 
@@ -165,6 +234,10 @@ def get_details_from_cloudmusic(*songids: int | str,
         *songids: 一个或多个歌曲 ID
         raw_response (bool): 返回原始响应对象；
             默认为否（返回一个对结果进行 JSON 反序列化后得到的 dict）
+        timeout (float | None): 本次调用的截止时间（秒），默认不限制
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100），默认不发出对冲请求
+    Raises:
+        requests.RequestException: 网络、远端相关错误
     """
     songids_ = [int(_) for _ in songids]
     payload = {
@@ -174,7 +247,79 @@ def get_details_from_cloudmusic(*songids: int | str,
     }
     url = 'https://music.163.com/api/v3/song/detail'
 
-    resp = requests.post(url=url, data=payload)
+    with deadline(timeout):
+        resp = send('POST', url, source='cloudmusic', hedge=hedge, data=payload)
+    if raw_response:
+        return resp
+    return resp.json()
+
+
+def get_album_details_from_qqmusic(albummid: str,
+                                   result_size: int = 500,
+                                   raw_response=False,
+                                   timeout: float | None = None,
+                                   hedge: float | None = None
+                                   ) -> dict | requests.Response:
+    """从 QQ 音乐获取一张专辑的曲目列表，只需要一次请求。
+
+    Args:
+        albummid (str): 专辑 mID
+        result_size (int): 最多获取的曲目数量，默认为 500
+        raw_response (bool): 返回原始响应对象；
+            默认为否（返回一个对结果进行 JSON 反序列化后得到的 dict）
+        timeout (float | None): 本次调用的截止时间（秒），默认不限制
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100），默认不发出对冲请求
+    Raises:
+        requests.RequestException: 网络、远端相关错误
+    """
+    url = 'http://u.y.qq.com/cgi-bin/musicu.fcg'
+    params = {
+        'data': json.dumps(
+            {
+                'albumSonglist': {
+                    'method': 'GetAlbumSongList',
+                    'module': 'music.musichallAlbum.AlbumSongList',
+                    'param': {
+                        'albumMid': albummid,
+                        'albumID': 0,
+                        'begin': 0,
+                        'num': result_size,
+                        'order': 2
+                    }
+                }
+            }
+        )
+    }
+
+    with deadline(timeout):
+        resp = send('GET', url, source='qqmusic', hedge=hedge, params=params)
+    resp.raise_for_status()
+    if raw_response:
+        return resp
+    return resp.json()
+
+
+def get_album_details_from_cloudmusic(albumid: int | str,
+                                      raw_response=False,
+                                      timeout: float | None = None,
+                                      hedge: float | None = None
+                                      ) -> dict | requests.Response:
+    """从网易云音乐获取一张专辑的信息及其曲目列表，只需要一次请求。
+
+    Args:
+        albumid (int | str): 专辑 ID
+        raw_response (bool): 返回原始响应对象；
+            默认为否（返回一个对结果进行 JSON 反序列化后得到的 dict）
+        timeout (float | None): 本次调用的截止时间（秒），默认不限制
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100），默认不发出对冲请求
+    Raises:
+        requests.RequestException: 网络、远端相关错误
+    """
+    url = f'https://music.163.com/api/v1/album/{int(albumid)}'
+
+    with deadline(timeout):
+        resp = send('GET', url, source='cloudmusic', hedge=hedge)
+    resp.raise_for_status()
     if raw_response:
         return resp
     return resp.json()
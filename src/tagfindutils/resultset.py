@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import math
+import sys
+from array import array
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Iterator, Sequence
+
+from . import cloudmusic, qqmusic
+from .cloudmusic import CloudMusicSearchResult
+from .qqmusic import QQMusicSearchResult
+from .structures import SearchResult, SongDetail
+
+_NO_INT = -2 ** 63
+_NO_STR = -1
+_EPOCH = datetime(1970, 1, 1)
+
+_RESULT_TYPES = {
+    'cloudmusic': CloudMusicSearchResult,
+    'qqmusic': QQMusicSearchResult
+}
+_SORT_KEYS = ('songid', 'albumid', 'publish_time')
+_MULTI_FIELDS = ('artists', 'artistids', 'artistmids', 'aliases', 'translations')
+
+
+class SearchResultView(SearchResult):
+    """``SearchResultSet`` 中单个搜索结果的只读视图，所有属性均从列式存储中按需读取。"""
+
+    def __init__(self, result_set: SearchResultSet, idx: int) -> None:
+        self._set = result_set
+        self._idx = idx
+
+    @property
+    def source(self) -> str:
+        return self._set.source
+
+    @property
+    def _result_type(self) -> type[SearchResult]:
+        return _RESULT_TYPES[self._set.source]
+
+    @property
+    def _fields(self) -> tuple[str, ...]:
+        # 与来源对应的搜索结果类型相同，使 to_dict() 包含 QQ 音乐的 mID 等字段
+        return self._result_type._fields
+
+    @property
+    def album(self) -> str | None:
+        return self._set._get_str('_albums', self._idx)
+
+    @property
+    def albumid(self) -> int | None:
+        return self._set._get_int('_albumids', self._idx)
+
+    @property
+    def albummid(self) -> str | None:
+        return self._set._get_str('_albummids', self._idx)
+
+    @property
+    def aliases(self) -> list[str]:
+        return self._set._get_multi('aliases', self._idx)
+
+    @property
+    def translations(self) -> list[str]:
+        return self._set._get_multi('translations', self._idx)
+
+    @property
+    def artists(self) -> list[str]:
+        return self._set._get_multi('artists', self._idx)
+
+    @property
+    def artistids(self) -> list[int]:
+        return self._set._get_multi('artistids', self._idx)
+
+    @property
+    def artistmids(self) -> list[str]:
+        return self._set._get_multi('artistmids', self._idx)
+
+    @property
+    def coverurl(self) -> str | None:
+        return self._set._get_str('_coverurls', self._idx)
+
+    @property
+    def songname(self) -> str | None:
+        return self._set._get_str('_songnames', self._idx)
+
+    @property
+    def songid(self) -> int | None:
+        return self._set._get_int('_songids', self._idx)
+
+    @property
+    def songmid(self) -> str | None:
+        return self._set._get_str('_songmids', self._idx)
+
+    @property
+    def publish_time(self) -> datetime | None:
+        seconds = self._set._publish_times[self._idx]
+        if not math.isnan(seconds):
+            return _EPOCH + timedelta(seconds=seconds)
+
+    def get_detail(self) -> SongDetail | None:
+        if self.source == 'qqmusic':
+            if self.songmid:
+                ret = qqmusic.details(self.songmid)
+                if len(ret) != 0:
+                    return ret[0]
+        elif self.songid is not None:
+            ret = cloudmusic.details(self.songid)
+            if len(ret) != 0:
+                return ret[0]
+
+
+class SearchResultSet:
+    """以列式方式存储大量同一来源的搜索结果。
+
+    ID 和发布时间保存在紧凑的数组中，所有字符串（歌名、歌手、专辑等）都保存在一张共享的字符串表中，
+    每个不同的字符串只保存一次；歌手、别名等多值字段使用“扁平数组 + 偏移量数组”的方式保存。
+    原始的 dict 不会被保留。
+
+    过滤、排序、去重等操作均返回新的结果集，与原结果集共享同一张字符串表；
+    通过下标访问时，才会按需构造 ``SearchResultView``。
+
+    Args:
+        source (str): 搜索结果的来源，可选值见 ``supported_sources()``
+        results: 初始的搜索结果
+    Raises:
+        ValueError: 为参数 ``source`` 指定了不支持的值，或搜索结果的类型与来源不符
+    """
+
+    def __init__(self, source: str, results: Iterable[SearchResult] = ()) -> None:
+        if source not in _RESULT_TYPES:
+            raise ValueError(f'不支持的搜索来源：{repr(source)}')
+        self.source = source
+        self._strings: list[str] = []
+        self._string_index: dict[str, int] = {}
+        self._init_columns()
+        self.extend(results)
+
+    def _init_columns(self) -> None:
+        self._songids = array('q')
+        self._albumids = array('q')
+        self._publish_times = array('d')
+        self._songnames = array('l')
+        self._songmids = array('l')
+        self._albums = array('l')
+        self._albummids = array('l')
+        self._coverurls = array('l')
+        self._multi_values: dict[str, array] = {
+            'artists': array('l'),
+            'artistids': array('q'),
+            'artistmids': array('l'),
+            'aliases': array('l'),
+            'translations': array('l')
+        }
+        self._multi_offsets: dict[str, array] = {_: array('q', [0]) for _ in _MULTI_FIELDS}
+
+    @classmethod
+    def from_results(cls, results: Sequence[SearchResult]) -> SearchResultSet:
+        """根据搜索结果的类型推断来源，构造结果集。
+
+        Raises:
+            ValueError: ``results`` 为空，或其中包含不受支持的类型
+        """
+        if not results:
+            raise ValueError('无法从空的搜索结果推断来源')
+        for source, result_type in _RESULT_TYPES.items():
+            if isinstance(results[0], result_type):
+                return cls(source, results)
+        raise ValueError(f'不支持的搜索结果类型：{type(results[0]).__name__}')
+
+    def _intern(self, value: str | None) -> int:
+        if value is None:
+            return _NO_STR
+        idx = self._string_index.get(value)
+        if idx is None:
+            idx = self._string_index[value] = len(self._strings)
+            self._strings.append(sys.intern(value))
+        return idx
+
+    def _get_str(self, column: str, idx: int) -> str | None:
+        str_idx = getattr(self, column)[idx]
+        if str_idx != _NO_STR:
+            return self._strings[str_idx]
+
+    def _get_int(self, column: str, idx: int) -> int | None:
+        value = getattr(self, column)[idx]
+        if value != _NO_INT:
+            return value
+
+    def _get_multi(self, field: str, idx: int) -> list:
+        offsets = self._multi_offsets[field]
+        values = self._multi_values[field][offsets[idx]:offsets[idx + 1]]
+        if field == 'artistids':
+            return list(values)
+        return [self._strings[_] for _ in values]
+
+    def append(self, result: SearchResult) -> None:
+        if not isinstance(result, (_RESULT_TYPES[self.source], SearchResultView)) or \
+                getattr(result, 'source', self.source) != self.source:
+            raise ValueError(f"搜索结果的类型与来源 '{self.source}' 不符：{type(result).__name__}")
+
+        songid = result.songid
+        albumid = result.albumid
+        publish_time = result.publish_time
+        self._songids.append(_NO_INT if songid is None else songid)
+        self._albumids.append(_NO_INT if albumid is None else albumid)
+        self._publish_times.append(
+            math.nan if publish_time is None else (publish_time - _EPOCH).total_seconds()
+        )
+        self._songnames.append(self._intern(result.songname))
+        self._songmids.append(self._intern(getattr(result, 'songmid', None)))
+        self._albums.append(self._intern(result.album))
+        self._albummids.append(self._intern(getattr(result, 'albummid', None)))
+        self._coverurls.append(self._intern(result.coverurl))
+
+        for field in _MULTI_FIELDS:
+            values = getattr(result, field, [])
+            if field != 'artistids':
+                values = [self._intern(_) for _ in values]
+            self._multi_values[field].extend(values)
+            self._multi_offsets[field].append(len(self._multi_values[field]))
+
+    def extend(self, results: Iterable[SearchResult]) -> None:
+        for result in results:
+            self.append(result)
+
+    def __len__(self) -> int:
+        return len(self._songids)
+
+    def __getitem__(self, idx: int) -> SearchResultView:
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError('结果集下标越界')
+        return SearchResultView(self, idx)
+
+    def __iter__(self) -> Iterator[SearchResultView]:
+        for idx in range(len(self)):
+            yield SearchResultView(self, idx)
+
+    def __repr__(self) -> str:
+        return f'<SearchResultSet source={self.source!r} size={len(self)} strings={len(self._strings)}>'
+
+    @property
+    def songids(self) -> array:
+        """所有结果的歌曲 ID；缺失值为 ``-2 ** 63``。"""
+        return self._songids
+
+    @property
+    def albumids(self) -> array:
+        """所有结果的专辑 ID；缺失值为 ``-2 ** 63``。"""
+        return self._albumids
+
+    def take(self, indices: Iterable[int]) -> SearchResultSet:
+        """按给定的下标顺序选取结果，返回新的结果集。"""
+        ret = SearchResultSet.__new__(SearchResultSet)
+        ret.source = self.source
+        ret._strings = self._strings
+        ret._string_index = self._string_index
+        ret._init_columns()
+
+        for idx in indices:
+            for column in ('_songids', '_albumids', '_publish_times', '_songnames',
+                           '_songmids', '_albums', '_albummids', '_coverurls'):
+                getattr(ret, column).append(getattr(self, column)[idx])
+            for field in _MULTI_FIELDS:
+                offsets = self._multi_offsets[field]
+                ret._multi_values[field].extend(self._multi_values[field][offsets[idx]:offsets[idx + 1]])
+                ret._multi_offsets[field].append(len(ret._multi_values[field]))
+
+        return ret
+
+    def filter(self, predicate: Callable[[SearchResultView], bool] | Sequence[bool]) -> SearchResultSet:
+        """筛选结果，返回新的结果集。
+
+        Args:
+            predicate: 对每个结果调用的判断函数，或与结果集等长的布尔值序列
+        """
+        if callable(predicate):
+            return self.take(idx for idx in range(len(self)) if predicate(SearchResultView(self, idx)))
+        if len(predicate) != len(self):
+            raise ValueError('布尔值序列的长度与结果集不符')
+        return self.take(idx for idx, keep in enumerate(predicate) if keep)
+
+    def sort_by(self, key: str = 'publish_time', reverse=False) -> SearchResultSet:
+        """按 ``'songid'``、``'albumid'`` 或 ``'publish_time'`` 排序，返回新的结果集；缺失值总是排在最后。
+
+        Raises:
+            ValueError: 为参数 ``key`` 指定了不支持的值
+        """
+        if key not in _SORT_KEYS:
+            raise ValueError(f'不支持的排序字段：{repr(key)}')
+        if key == 'publish_time':
+            column = self._publish_times
+            missing = [idx for idx in range(len(self)) if math.isnan(column[idx])]
+        else:
+            column = getattr(self, f'_{key}s')
+            missing = [idx for idx in range(len(self)) if column[idx] == _NO_INT]
+        missing_set = set(missing)
+        present = sorted(
+            (idx for idx in range(len(self)) if idx not in missing_set),
+            key=column.__getitem__,
+            reverse=reverse
+        )
+        return self.take(present + missing)
+
+    def dedup(self, by: str = 'songid') -> SearchResultSet:
+        """按 ``'songid'`` 或 ``'albumid'`` 去重，保留每个 ID 第一次出现的结果，返回新的结果集。
+
+        缺失 ID 的结果总是被保留。
+
+        Raises:
+            ValueError: 为参数 ``by`` 指定了不支持的值
+        """
+        if by not in ('songid', 'albumid'):
+            raise ValueError(f'不支持的去重字段：{repr(by)}')
+        column = getattr(self, f'_{by}s')
+        seen = set()
+        keep = []
+        for idx, value in enumerate(column):
+            if value == _NO_INT:
+                keep.append(idx)
+            elif value not in seen:
+                seen.add(value)
+                keep.append(idx)
+        return self.take(keep)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import io
+import json
+import pickle
+from datetime import datetime, timedelta
+from typing import Any
+
+from .cloudmusic import CloudMusicSearchResult, CloudMusicSongDetail
+from .qqmusic import QQMusicSearchResult, QQMusicSongDetail
+from .resultset import SearchResultView
+from .structures import SearchResult
+
+# 二进制格式：
+#   1 字节版本号、1 字节类型标签，之后是一个列表，按类的 _fields 顺序依次存放各个字段的值（不包含字段名）；
+#   发布时间存放为自 1970-01-01 00:00:00 起的微秒数（不涉及时区转换）。
+#   版本 2 的列表以 pickle 协议 4 编码，其中只包含 None、bool、int、str 和 list；
+#   解码时禁止加载任何全局对象（类、函数等），因此解码不可信的数据也不会执行任意代码。
+#   版本 1 的列表为 UTF-8 编码的紧凑 JSON 数组，仍可解码。
+# 编码时各个类一次遍历原始响应得到所有字段；解码得到的对象只保存字段的值，原始响应在首次被访问时才构造。
+_VERSION = 2
+_PICKLE_PROTOCOL = 4
+_TYPES: dict[int, type[SearchResult]] = {
+    1: CloudMusicSearchResult,
+    2: CloudMusicSongDetail,
+    3: QQMusicSearchResult,
+    4: QQMusicSongDetail
+}
+_TAGS = {v: k for k, v in _TYPES.items()}
+# 所有类型的 _fields 都以 SearchResult._fields 开头，发布时间的位置相同
+_PUBLISH_TIME_INDEX = SearchResult._fields.index('publish_time')
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_json_decoder = json.JSONDecoder()
+
+
+class _ValuesUnpickler(pickle.Unpickler):
+    def find_class(self, module: str, name: str) -> Any:
+        raise pickle.UnpicklingError(f'编码数据中不应包含全局对象：{module}.{name}')
+
+
+def encode(result: SearchResult) -> bytes:
+    """将搜索结果或详细信息中各个规范化后的字段编码为紧凑的二进制格式。
+
+    ``SearchResultSet`` 中的视图按其来源对应的搜索结果类型编码，解码后得到该类型的对象。
+
+    Raises:
+        ValueError: 不支持的类型
+    """
+    result_type = result._result_type if isinstance(result, SearchResultView) else type(result)
+    tag = _TAGS.get(result_type)
+    if tag is None:
+        raise ValueError(f'不支持的类型：{type(result).__name__}')
+
+    values = result._field_values()
+    publish_time = values[_PUBLISH_TIME_INDEX]
+    if publish_time is not None:
+        # _field_values() 的返回值可能是对象保存的值，不能原地修改
+        values = list(values)
+        values[_PUBLISH_TIME_INDEX] = (publish_time - _EPOCH) // _MICROSECOND
+
+    return bytes((_VERSION, tag)) + pickle.dumps(values, _PICKLE_PROTOCOL)
+
+
+def _decode_values(data: bytes | bytearray | memoryview) -> tuple[type[SearchResult], list]:
+    # 按 _fields 的顺序返回各个字段的值，发布时间被还原为 datetime
+    if len(data) < 2 or data[0] not in (1, _VERSION) or data[1] not in _TYPES:
+        raise ValueError('不是有效的编码数据，或编码数据的版本不受支持')
+    cls = _TYPES[data[1]]
+
+    if data[0] == 1:
+        values = _json_decoder.decode(str(data[2:], 'utf-8'))
+    else:
+        try:
+            values = _ValuesUnpickler(io.BytesIO(data[2:])).load()
+        except Exception as exc:
+            raise ValueError('编码数据已损坏') from exc
+    if not isinstance(values, list) or len(values) != len(cls._fields):
+        raise ValueError('编码数据已损坏：字段数量不符')
+    publish_time = values[_PUBLISH_TIME_INDEX]
+    if publish_time is not None:
+        values[_PUBLISH_TIME_INDEX] = _EPOCH + publish_time * _MICROSECOND
+
+    return cls, values
+
+
+def decode_dict(data: bytes | bytearray | memoryview) -> tuple[type[SearchResult], dict[str, Any]]:
+    """将 ``encode()`` 编码的数据解码为 (类型, ``to_dict()`` 格式的 dict)。
+
+    Raises:
+        ValueError: 数据的版本或类型标签不受支持，或数据已损坏
+    """
+    cls, values = _decode_values(data)
+    ret = dict(zip(cls._fields, values))
+    publish_time = ret['publish_time']
+    if publish_time is not None:
+        ret['publish_time'] = publish_time.isoformat()
+
+    return cls, ret
+
+
+def decode(data: bytes | bytearray | memoryview) -> SearchResult:
+    """将 ``encode()`` 编码的数据还原为对象，其各个字段与编码前完全相同。
+
+    Raises:
+        ValueError: 数据的版本或类型标签不受支持，或数据已损坏
+    """
+    cls, values = _decode_values(data)
+    return cls._from_values(values)
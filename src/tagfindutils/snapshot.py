@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+import struct
+from hashlib import blake2b
+from os import PathLike
+from typing import Iterable
+
+from .cloudmusic import CloudMusicSongDetail
+from .qqmusic import QQMusicSongDetail
+from .structures import SongDetail
+
+# 文件格式（所有整数均为小端序）：
+#   文件头：魔数 8 字节、版本号 u32、槽位数量 u32、记录数量 u32、保留 u32
+#   槽位表：每个槽位为 键的哈希 u64、记录偏移 u64、键长度 u32、内容长度 u32；哈希为 0 表示空槽位
+#   数据区：每条记录为 键（UTF-8）紧接着内容（UTF-8 JSON）
+# 槽位表为开放寻址（线性探测）的哈希表，槽位数量为 2 的幂，且至少为记录数量的 2 倍。
+_MAGIC = b'TFUSNAP\x00'
+_VERSION = 1
+_HEADER = struct.Struct('<8sIII4x')
+_SLOT = struct.Struct('<QQII')
+
+
+def _hash_key(key: bytes) -> int:
+    return int.from_bytes(blake2b(key, digest_size=8).digest(), 'little') or 1
+
+
+def _make_key(source: str, songid: int | str) -> bytes:
+    return f'{source}:{songid}'.encode('utf-8')
+
+
+def _detail_to_record(detail: SongDetail) -> tuple[bytes, dict]:
+    if isinstance(detail, CloudMusicSongDetail):
+        if detail.songid is None:
+            raise ValueError('详细信息缺少歌曲 ID，无法写入快照')
+        return _make_key('cloudmusic', detail.songid), detail._raw_result
+    if isinstance(detail, QQMusicSongDetail):
+        if not detail.songmid:
+            raise ValueError('详细信息缺少歌曲 mID，无法写入快照')
+        return _make_key('qqmusic', detail.songmid), {
+            'data': {
+                'track_info': detail._track_info,
+                'extras': detail._extra_info,
+                'info': detail._misc_info
+            }
+        }
+    raise ValueError(f'不支持的详细信息类型：{type(detail).__name__}')
+
+
+def export_snapshot(path: str | PathLike, details: Iterable[SongDetail]) -> int:
+    """将一批歌曲的详细信息写入只读的快照文件，返回写入的记录数量。
+
+    网易云音乐的记录以 songid 为键，QQ 音乐的记录以 songmid 为键；键重复时以最后一次出现的为准。
+    文件先写入临时文件，再替换目标文件，因此正在读取旧快照的进程不受影响。
+
+    Args:
+        path (str | PathLike): 快照文件的路径
+        details: 歌曲的详细信息
+    Raises:
+        ValueError: 详细信息的类型不受支持，或缺少 ID
+    """
+    records: dict[bytes, bytes] = {}
+    for detail in details:
+        key, raw = _detail_to_record(detail)
+        records[key] = json.dumps(raw, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    slot_count = 1
+    while slot_count < len(records) * 2:
+        slot_count *= 2
+    slots = [(0, 0, 0, 0)] * slot_count
+    data_offset = _HEADER.size + _SLOT.size * slot_count
+
+    data = bytearray()
+    for key, payload in records.items():
+        slot_idx = _hash_key(key) & (slot_count - 1)
+        while slots[slot_idx][0] != 0:
+            slot_idx = (slot_idx + 1) & (slot_count - 1)
+        slots[slot_idx] = (_hash_key(key), data_offset + len(data), len(key), len(payload))
+        data += key
+        data += payload
+
+    tmp_path = f'{os.fspath(path)}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, slot_count, len(records)))
+        for slot in slots:
+            f.write(_SLOT.pack(*slot))
+        f.write(data)
+    os.replace(tmp_path, path)
+
+    return len(records)
+
+
+class Snapshot:
+    """以内存映射方式打开 ``export_snapshot()`` 写出的快照文件。
+
+    打开文件几乎不需要时间，也不会读取整个文件；按 ID 查找的时间复杂度为 O(1)。
+    多个进程打开同一个快照时，操作系统会在它们之间共享文件页。
+
+    Args:
+        path (str | PathLike): 快照文件的路径
+    Raises:
+        ValueError: 文件不是受支持的快照文件
+    """
+
+    def __init__(self, path: str | PathLike) -> None:
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        if len(self._view) < _HEADER.size:
+            self.close()
+            raise ValueError('不是有效的快照文件')
+        magic, version, self._slot_count, self._count = _HEADER.unpack_from(self._view)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError('不是有效的快照文件，或快照文件的版本不受支持')
+
+    def close(self) -> None:
+        """关闭快照；可以重复调用。
+
+        ``raw()`` 返回的内存视图尚未全部释放时，这些视图仍然可用，
+        文件映射会在它们全部被释放后才解除。
+        """
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # 映射仍被 raw() 返回的内存视图引用，这些视图释放后映射对象会被回收并解除映射
+            pass
+
+    def __enter__(self) -> Snapshot:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def raw(self, source: str, songid: int | str) -> memoryview | None:
+        """返回记录内容（UTF-8 JSON）的只读内存视图，不复制数据；不存在时返回 ``None``。
+
+        返回的视图在快照关闭后仍然可用；不再需要时可调用其 ``release()`` 方法尽早解除文件映射。
+
+        Args:
+            source (str): ``'cloudmusic'`` 或 ``'qqmusic'``
+            songid (int | str): 网易云音乐的 songid，或 QQ 音乐的 songmid
+        """
+        if self._slot_count == 0:
+            return None
+        key = _make_key(source, songid)
+        key_hash = _hash_key(key)
+        slot_idx = key_hash & (self._slot_count - 1)
+        while True:
+            slot_hash, offset, key_len, payload_len = _SLOT.unpack_from(
+                self._view, _HEADER.size + slot_idx * _SLOT.size
+            )
+            if slot_hash == 0:
+                return None
+            if slot_hash == key_hash and self._view[offset:offset + key_len] == key:
+                return self._view[offset + key_len:offset + key_len + payload_len]
+            slot_idx = (slot_idx + 1) & (self._slot_count - 1)
+
+    def __contains__(self, item: tuple[str, int | str]) -> bool:
+        return self.raw(*item) is not None
+
+    def get_cloudmusic(self, songid: int | str) -> CloudMusicSongDetail | None:
+        payload = self.raw('cloudmusic', int(songid))
+        if payload is not None:
+            return CloudMusicSongDetail(json.loads(payload.tobytes()))
+
+    def get_qqmusic(self, songmid: str) -> QQMusicSongDetail | None:
+        payload = self.raw('qqmusic', songmid)
+        if payload is not None:
+            return QQMusicSongDetail(json.loads(payload.tobytes()))
+
+    def get(self, source: str, songid: int | str) -> SongDetail | None:
+        """根据来源和 ID 查找歌曲的详细信息；不存在时返回 ``None``。
+
+        Raises:
+            ValueError: 为参数 ``source`` 指定了不支持的值
+        """
+        if source == 'cloudmusic':
+            return self.get_cloudmusic(songid)
+        if source == 'qqmusic':
+            return self.get_qqmusic(songid)
+        raise ValueError(f'不支持的搜索来源：{repr(source)}')
+
+
+def main(argv: list[str] | None = None) -> None:
+    from . import cloudmusic, qqmusic
+
+    parser = argparse.ArgumentParser(
+        prog='python -m tagfindutils.snapshot',
+        description='获取指定歌曲的详细信息，并写入只读的快照文件'
+    )
+    parser.add_argument('path', help='快照文件的路径')
+    parser.add_argument('--cloudmusic', nargs='*', default=[], metavar='SONGID', help='网易云音乐的歌曲 ID')
+    parser.add_argument('--qqmusic', nargs='*', default=[], metavar='SONGMID', help='QQ 音乐的歌曲 mID')
+    args = parser.parse_args(argv)
+
+    details: list[SongDetail] = []
+    if args.cloudmusic:
+        details.extend(cloudmusic.details(*args.cloudmusic))
+    if args.qqmusic:
+        details.extend(_ for _ in qqmusic.details(*args.qqmusic) if _.songmid)
+    count = export_snapshot(args.path, details)
+    print(f'已写入 {count} 条记录到 {args.path}')
+
+
+if __name__ == '__main__':
+    main()
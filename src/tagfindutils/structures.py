@@ -7,7 +7,30 @@ from typing import Any, Generic, Type
 from .utils import T, T_OUT, type_filter
 
 
+class _LazyRaw:
+    """原始响应属性的非数据描述符：通过 ``_from_values()`` 构造的对象只保存各个字段的值，
+    在首次访问原始响应时才用 ``from_dict()`` 构造；通过其他方式构造的对象不受影响。
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._name = name
+
+    def __get__(self, obj: SearchResult | None, objtype: type | None = None) -> Any:
+        if obj is None:
+            return self
+        values = obj.__dict__.get('_values')
+        if values is None:
+            raise AttributeError(self._name)
+        obj.__dict__.update(type(obj).from_dict(dict(zip(obj._fields, values))).__dict__)
+        return obj.__dict__[self._name]
+
+
 class SearchResult(Generic[T]):
+    _fields: tuple[str, ...] = (
+        'songname', 'songid', 'album', 'albumid', 'aliases', 'translations',
+        'artists', 'artistids', 'coverurl', 'publish_time'
+    )
+
     @property
     @abstractmethod
     def album(self) -> str | None:
@@ -89,11 +112,71 @@ class SearchResult(Generic[T]):
     def type_filter(cls, value: Any, t: Type[T_OUT], allow_None=True) -> T_OUT:
         return type_filter(value=value, t=t, allow_None=allow_None)
 
+    def to_dict(self) -> dict[str, Any]:
+        """将各个规范化后的字段导出为只包含基本类型的 dict，发布时间以 ISO 8601 格式的字符串表示。
+
+        原始响应中的其他字段不会被导出；``from_dict()`` 可以从导出的 dict 还原出字段完全相同的对象。
+        """
+        ret = {}
+        for field, value in zip(self._fields, self._field_values()):
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            elif isinstance(value, list):
+                value = list(value)
+            ret[field] = value
+
+        return ret
+
+    def _field_values(self) -> list:
+        # 按 _fields 的顺序返回各个字段规范化后的值；返回值不应被修改
+        values = self.__dict__.get('_values')
+        if values is None:
+            values = self._values_from_raw()
+        if values is None:
+            values = [getattr(self, field) for field in self._fields]
+        return values
+
+    def _values_from_raw(self) -> list | None:
+        # 子类可覆盖为只遍历一次原始响应的实现，结果须与各个属性完全相同；
+        # 遇到类型不符的值时返回 None，改为通过各个属性读取（并由属性引发相应的异常）
+        return None
+
+    @classmethod
+    @abstractmethod
+    def from_dict(cls, data: dict[str, Any]) -> SearchResult:
+        """根据 ``to_dict()`` 导出的 dict 还原对象。"""
+        pass
+
+    @classmethod
+    def _from_values(cls, values: list) -> SearchResult:
+        # 仅用于 serialization.decode()：values 必须是 _field_values() 的结果，原始响应在首次被访问时才构造
+        obj = cls.__new__(cls)
+        obj._values = values
+        return obj
+
+    @classmethod
+    def _from_raw(cls, **attrs: Any) -> SearchResult:
+        # 跳过 __init__ 中对原始响应的深拷贝，仅用于 from_dict() 中新构造的原始响应
+        obj = cls.__new__(cls)
+        obj.__dict__.update(attrs)
+        return obj
+
+    @staticmethod
+    def _publish_time_from_dict(data: dict[str, Any]) -> datetime | None:
+        value = data.get('publish_time')
+        if isinstance(value, datetime):
+            # serialization.decode() 直接传入 datetime，省去与字符串之间的来回转换
+            return value
+        if value:
+            return datetime.fromisoformat(value)
+
     def get_detail(self) -> SongDetail | None:
         pass
 
 
 class SongDetail(SearchResult):
+    _fields = SearchResult._fields + ('genre', 'company')
+
     @property
     @abstractmethod
     def album(self) -> str | None:
@@ -183,3 +266,70 @@ class SongDetail(SearchResult):
 
     def get_detail(self) -> SongDetail:
         return self
+
+
+class AlbumSearchResult(Generic[T]):
+    @property
+    @abstractmethod
+    def album(self) -> str | None:
+        pass
+
+    @property
+    @abstractmethod
+    def albumid(self) -> int | None:
+        pass
+
+    @property
+    @abstractmethod
+    def artists(self) -> list[str]:
+        pass
+
+    @property
+    @abstractmethod
+    def artistids(self) -> list[int]:
+        pass
+
+    @property
+    @abstractmethod
+    def coverurl(self) -> str | None:
+        pass
+
+    @property
+    @abstractmethod
+    def publish_time(self) -> datetime | None:
+        pass
+
+    @property
+    @abstractmethod
+    def track_count(self) -> int | None:
+        pass
+
+    @property
+    def property_sep(self) -> str:
+        return '、'
+
+    def __repr__(self) -> str:
+        ret_strseg = ['<']
+
+        if self.album:
+            ret_strseg.append(f'album: {self.album}')
+        else:
+            ret_strseg.append(f'noname')
+        if self.artists:
+            ret_strseg.append(f'artists: {self.property_sep.join(self.artists)}')
+        if self.track_count is not None:
+            ret_strseg.append(f'tracks: {self.track_count}')
+        if self.publish_time:
+            ret_strseg.append(f'publish time: {self.publish_time}')
+
+        if len(ret_strseg) <= 1:
+            ret_strseg.append('empty result')
+
+        return '\n    '.join(ret_strseg) + '\n>'
+
+    @classmethod
+    def type_filter(cls, value: Any, t: Type[T_OUT], allow_None=True) -> T_OUT:
+        return type_filter(value=value, t=t, allow_None=allow_None)
+
+    def get_tracklist(self) -> list[SongDetail]:
+        pass
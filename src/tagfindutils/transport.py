@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import contextvars
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Iterator, Protocol
+
+import requests
+
+from .circuitbreaker import CircuitOpenError, breakers
+
+DEFAULT_TIMEOUT: float = 10.0
+"""单次 HTTP 请求的默认超时时间（秒）。"""
+
+HEDGE_FALLBACK_DELAY: float = 1.0
+"""延迟样本不足时，发出对冲请求之前等待的时间（秒）。"""
+
+
+class RateLimiter(Protocol):
+    def acquire(self) -> None:
+        """阻塞，直到允许发出下一个请求。"""
+
+
+rate_limiters: dict[str, RateLimiter] = {}
+"""按来源（如 ``'qqmusic'``、``'cloudmusic'``）设置的请求速率限制器。"""
+
+_deadline_at: ContextVar[float | None] = ContextVar('_deadline_at', default=None)
+
+
+class DeadlineExceeded(requests.Timeout):
+    """截止时间已过，请求未能发出或未能完成。"""
+
+
+@contextmanager
+def deadline(seconds: float | None) -> Iterator[None]:
+    """在 with 语句块内设置截止时间，块内发出的所有请求共享这一时限。
+
+    限制的是每个请求的总耗时，而不只是连接和每次读取的等待时间；截止时间到达时仍未完成的请求会被放弃，
+    并引发 ``DeadlineExceeded``。嵌套使用时，以更早到期的截止时间为准；``seconds`` 为 ``None`` 时不做任何限制。
+
+    Args:
+        seconds (float | None): 从现在起允许花费的时间（秒）
+    """
+    if seconds is None:
+        yield
+        return
+
+    new_deadline_at = time.monotonic() + seconds
+    current_deadline_at = _deadline_at.get()
+    if current_deadline_at is not None:
+        new_deadline_at = min(new_deadline_at, current_deadline_at)
+    token = _deadline_at.set(new_deadline_at)
+    try:
+        yield
+    finally:
+        _deadline_at.reset(token)
+
+
+def remaining_time() -> float | None:
+    """返回距离当前截止时间的剩余秒数；未设置截止时间时返回 ``None``。"""
+    deadline_at = _deadline_at.get()
+    if deadline_at is None:
+        return None
+    return deadline_at - time.monotonic()
+
+
+def effective_timeout() -> float:
+    """计算下一个请求可用的超时时间：取默认超时与截止时间剩余时间中较小者。
+
+    Raises:
+        DeadlineExceeded: 截止时间已过
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return DEFAULT_TIMEOUT
+    if remaining <= 0:
+        raise DeadlineExceeded('截止时间已过，放弃发出请求')
+    return min(DEFAULT_TIMEOUT, remaining)
+
+
+class LatencyTracker:
+    """按 URL 记录最近的请求耗时，用于计算对冲请求的等待时间。"""
+
+    def __init__(self, maxlen: int = 200, min_samples: int = 20) -> None:
+        self._maxlen = maxlen
+        self._min_samples = min_samples
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = Lock()
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self._maxlen)
+            samples.append(seconds)
+
+    def percentile(self, key: str, pct: float) -> float | None:
+        """返回 ``key`` 的第 ``pct`` 百分位耗时；样本不足时返回 ``None``。"""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < self._min_samples:
+            return None
+        idx = min(len(samples) - 1, max(0, round(pct / 100 * len(samples)) - 1))
+        return samples[idx]
+
+
+latency_tracker = LatencyTracker()
+
+_request_executor: ThreadPoolExecutor | None = None
+_request_executor_lock = Lock()
+
+
+def _get_request_executor() -> ThreadPoolExecutor:
+    global _request_executor
+    with _request_executor_lock:
+        if _request_executor is None:
+            _request_executor = ThreadPoolExecutor(thread_name_prefix='tagfindutils-request')
+        return _request_executor
+
+
+def _submit(method: str, url: str, source: str | None, **kwargs) -> Future:
+    # 工作线程不会继承当前的上下文，需要复制一份以便在其中读取截止时间
+    return _get_request_executor().submit(contextvars.copy_context().run, _send_once, method, url, source, **kwargs)
+
+
+def _wait_first(futures: list[Future]) -> tuple[set[Future], set[Future]]:
+    # requests 的超时只限制连接和每次读取的等待时间，持续缓慢返回数据的服务器可以让请求无限延长；
+    # 因此在截止时间到达时停止等待，放弃仍未完成的请求
+    remaining = remaining_time()
+    done, not_done = wait(futures,
+                          timeout=None if remaining is None else max(0.0, remaining),
+                          return_when=FIRST_COMPLETED)
+    if not done:
+        raise DeadlineExceeded('截止时间已过，请求未能完成')
+    return done, not_done
+
+
+def _send_once(method: str, url: str, source: str | None, **kwargs) -> requests.Response:
+    limiter = rate_limiters.get(source)
+    if limiter is not None:
+        limiter.acquire()
+    # 等待速率限制之后再计算超时时间，使等待的时间也计入截止时间
+    timeout = effective_timeout()
+    start = time.monotonic()
+    try:
+        resp = requests.request(method, url, timeout=timeout, **kwargs)
+    except requests.Timeout as exc:
+        # 超时时间被截止时间缩短过，超时应归因于调用者而不是来源
+        if timeout < DEFAULT_TIMEOUT:
+            raise DeadlineExceeded('截止时间已过，请求未能完成') from exc
+        raise
+    latency_tracker.record(url, time.monotonic() - start)
+    return resp
+
+
+def send(method: str,
+         url: str,
+         *,
+         source: str | None = None,
+         hedge: float | None = None,
+         **kwargs
+         ) -> requests.Response:
+    """发出一个 HTTP 请求，遵循当前的截止时间，并可选地发出对冲请求。
+
+    指定 ``hedge`` 时，如果第一个请求在该 URL 历史耗时的第 ``hedge`` 百分位
+    之后仍未完成，则再发出一个相同的请求，并采用先到达的响应。
+
+    如果 ``source`` 在 ``circuitbreaker.breakers`` 中有对应的熔断器，
+    请求的成败（网络错误及 5xx 响应视为失败）会被记录到熔断器中；
+    因截止时间而失败的请求不计入失败次数。
+
+    Args:
+        method (str): HTTP 方法
+        url (str): 请求的 URL
+        source (str | None): 请求所属的来源，用于查找 ``rate_limiters`` 中的速率限制器
+        hedge (float | None): 发出对冲请求前等待的耗时百分位（0~100）；
+            默认为 ``None``（不发出对冲请求）
+        **kwargs: 传递给 ``requests.request()`` 的其他参数
+    Raises:
+        CircuitOpenError: 来源的熔断器处于断开状态
+        DeadlineExceeded: 截止时间已过
+        requests.RequestException: 网络、远端相关错误
+    """
+    breaker = breakers.get(source)
+    if breaker is None:
+        return _send_with_hedge(method, url, source, hedge, **kwargs)
+
+    # 截止时间已过属于调用者的问题，不应计入来源的失败次数
+    effective_timeout()
+    breaker.before_call()
+    try:
+        resp = _send_with_hedge(method, url, source, hedge, **kwargs)
+    except CircuitOpenError:
+        raise
+    except DeadlineExceeded:
+        breaker.record_neutral()
+        raise
+    except requests.RequestException:
+        breaker.record_failure()
+        raise
+    if resp.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return resp
+
+
+def _send_with_hedge(method: str,
+                     url: str,
+                     source: str | None,
+                     hedge: float | None,
+                     **kwargs
+                     ) -> requests.Response:
+    if hedge is None:
+        if remaining_time() is None:
+            return _send_once(method, url, source, **kwargs)
+        return _wait_first([_submit(method, url, source, **kwargs)])[0].pop().result()
+
+    delay = latency_tracker.percentile(url, hedge)
+    if delay is None:
+        delay = HEDGE_FALLBACK_DELAY
+    remaining = remaining_time()
+    if remaining is not None:
+        delay = min(delay, remaining)
+
+    primary = _submit(method, url, source, **kwargs)
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+
+    pending: list[Future] = [primary]
+    remaining = remaining_time()
+    if remaining is None or remaining > 0:
+        pending.append(_submit(method, url, source, **kwargs))
+    error: BaseException | None = None
+    while pending:
+        done, not_done = _wait_first(pending)
+        for future in done:
+            exc = future.exception()
+            if exc is None:
+                return future.result()
+            error = exc
+        pending = list(not_done)
+    raise error
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-from typing import Any, Type, TypeVar
+import logging
+from typing import Any, Callable, Type, TypeVar
 
 T = TypeVar('T')
 T_OUT = TypeVar('T_OUT')
 
+_logger = logging.getLogger(__name__)
+
 
 def type_filter(value: Any, t: Type[T_OUT], allow_None=True) -> T_OUT:
     if value is None and allow_None:
@@ -14,3 +17,18 @@ def type_filter(value: Any, t: Type[T_OUT], allow_None=True) -> T_OUT:
     raise ValueError(f"unexpected type of value from result "
                      f"(should be '{t.__name__}', got '{type(value).__name__}')"
                      )
+
+
+result_hooks: list[Callable[[list], None]] = []
+"""每当从网络获取到一批搜索结果或详细信息时，都会以该批结果为参数调用其中的每个函数。
+
+函数引发的异常会被记录到日志中，不会影响获取结果的调用。
+"""
+
+
+def notify_results(results: list) -> None:
+    for hook in list(result_hooks):
+        try:
+            hook(results)
+        except Exception:
+            _logger.exception('处理结果的钩子函数 %r 引发了异常', hook)
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from multiprocessing.managers import DictProxy
+from typing import Iterable, Sequence
+
+from . import cloudmusic, qqmusic, transport
+from .normalize import canonical_key, normalize_keywords
+from .serialization import decode, encode
+from .structures import SearchResult, SongDetail
+
+_SOURCES = {
+    'cloudmusic': cloudmusic,
+    'qqmusic': qqmusic
+}
+_IN_FLIGHT_POLL_INTERVAL = 0.05
+
+
+class SharedRateLimiter:
+    """可在多个进程之间共享的令牌桶速率限制器。
+
+    令牌桶的状态保存在共享内存中，并由一个跨进程的锁保护；
+    所有持有同一个实例的进程共同遵守同一个速率预算。
+    实例只能在创建进程时（例如通过进程池的 ``initargs``）传递给子进程。
+
+    Args:
+        rate (float): 每秒允许发出的请求数量
+        burst (float | None): 允许瞬间发出的最大请求数量；默认与 ``rate`` 相同（至少为 1）
+    """
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError(f'rate 必须为正数，而不是 {repr(rate)}')
+        self.rate = rate
+        self.burst = max(1.0, rate) if burst is None else burst
+        # [当前令牌数, 上次更新的时间]；time.monotonic() 在 Linux/macOS 上是系统范围的，可以跨进程比较
+        self._state = multiprocessing.Array('d', [self.burst, time.monotonic()])
+
+    def acquire(self) -> None:
+        while True:
+            with self._state.get_lock():
+                now = time.monotonic()
+                tokens = min(self.burst, self._state[0] + (now - self._state[1]) * self.rate)
+                self._state[1] = now
+                if tokens >= 1:
+                    self._state[0] = tokens - 1
+                    return
+                self._state[0] = tokens
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+
+_shared_cache: DictProxy | None = None
+
+
+def _init_worker(limiters: dict[str, SharedRateLimiter], shared_cache: DictProxy | None) -> None:
+    global _shared_cache
+    transport.rate_limiters.update(limiters)
+    _shared_cache = shared_cache
+
+
+def _claim(key: tuple) -> list[bytes] | None:
+    """返回共享缓存中的结果；缓存中没有时，由当前进程认领该键并返回 ``None``。
+
+    其他进程正在请求同一个键时，等待其完成，但不会超过当前的截止时间。
+
+    Raises:
+        DeadlineExceeded: 等待其他进程的结果时，截止时间已过
+    """
+    # 每个工作进程同一时刻只处理一个查询，因此进程 ID 足以区分认领者
+    token = ('in-flight', os.getpid())
+    while True:
+        cached = _shared_cache.setdefault(key, token)
+        if cached == token:
+            return None
+        if not isinstance(cached, tuple):
+            return cached
+        remaining = transport.remaining_time()
+        if remaining is not None and remaining <= 0:
+            raise transport.DeadlineExceeded('截止时间已过，仍未等到其他进程的搜索结果')
+        time.sleep(_IN_FLIGHT_POLL_INTERVAL if remaining is None else min(_IN_FLIGHT_POLL_INTERVAL, remaining))
+
+
+def _search_shared(source: str, keywords: tuple[str, ...], search_kwargs: dict) -> list[bytes]:
+    key = (source,
+           canonical_key(*keywords),
+           search_kwargs.get('result_pageidx', 0),
+           search_kwargs.get('result_size', 10))
+    # 等待其他进程的时间也计入调用者指定的截止时间
+    with transport.deadline(search_kwargs.get('timeout')):
+        cached = _claim(key)
+        if cached is not None:
+            return cached
+        done = False
+        try:
+            ret = [encode(_) for _ in _SOURCES[source].search(*normalize_keywords(*keywords), **search_kwargs)]
+            _shared_cache[key] = ret
+            done = True
+        finally:
+            if not done:
+                # 无论以何种方式失败，都释放认领，让等待中的进程自行重试
+                _shared_cache.pop(key, None)
+
+    return ret
+
+
+def _search_worker(args: tuple[str, tuple[str, ...], dict, bool]) -> list[bytes] | BaseException:
+    # 结果以 serialization.encode() 的格式返回，比直接 pickle 包含原始响应的对象更小、更快
+    source, keywords, search_kwargs, return_exceptions = args
+    try:
+        if _shared_cache is not None:
+            return _search_shared(source, keywords, search_kwargs)
+        return [encode(_) for _ in _SOURCES[source].search(*keywords, **search_kwargs)]
+    except Exception as exc:
+        if return_exceptions:
+            return exc
+        raise
+
+
+def _details_worker(args: tuple[str, tuple, dict, bool]) -> list[bytes] | BaseException:
+    source, ids, details_kwargs, return_exceptions = args
+    try:
+        return [encode(_) for _ in _SOURCES[source].details(*ids, **details_kwargs)]
+    except Exception as exc:
+        if return_exceptions:
+            return exc
+        raise
+
+
+def _decode_results(results: list[bytes] | BaseException) -> list | BaseException:
+    if isinstance(results, BaseException):
+        return results
+    return [decode(_) for _ in results]
+
+
+def _check_source(source: str) -> None:
+    if source not in _SOURCES:
+        raise ValueError(f'不支持的搜索来源：{repr(source)}')
+
+
+def bulk_search(queries: Iterable[str | Sequence[str]],
+                source: str = 'cloudmusic',
+                processes: int | None = None,
+                rate: float | SharedRateLimiter = 5.0,
+                shared_cache: bool = True,
+                chunksize: int = 8,
+                return_exceptions: bool = False,
+                **search_kwargs
+                ) -> list[list[SearchResult] | BaseException]:
+    """使用多个进程批量搜索，所有进程共享同一个速率预算和结果缓存。
+
+    Args:
+        queries: 多个查询；每个查询为一个关键词，或一组关键词
+        source (str): 搜索来源，可选值见 ``supported_sources()``；默认为 ``'cloudmusic'``
+        processes (int | None): 工作进程的数量；默认为 CPU 核心数
+        rate (float | SharedRateLimiter): 所有进程合计每秒最多发出的请求数量，
+            或者一个已有的 ``SharedRateLimiter``（以便多次批量任务共享同一预算）；默认为 5
+        shared_cache (bool): 是否在进程之间共享搜索结果缓存；
+            启用时关键词会被规范化，规范键相同的查询只发出一次请求（同时进行的相同查询会等待第一个请求的结果）。默认为是
+        chunksize (int): 每次分配给一个工作进程的查询数量，默认为 8
+        return_exceptions (bool): 将查询失败时引发的异常作为该查询的结果返回，而不是中止整个任务；默认为否
+        **search_kwargs: 传递给 ``search()`` 的其他参数
+    Raises:
+        ValueError: 为参数 ``source`` 指定了不支持的值
+        requests.RequestException: 网络、远端相关错误（``return_exceptions`` 为否时）
+
+    返回的列表与 ``queries`` 一一对应。结果在进程之间以 ``serialization.encode()`` 的格式传递，
+    因此只保留规范化后的字段，不包含原始响应中的其他字段。
+    """
+    _check_source(source)
+    limiter = rate if isinstance(rate, SharedRateLimiter) else SharedRateLimiter(rate)
+    tasks = [
+        (source, (query,) if isinstance(query, str) else tuple(query), search_kwargs, return_exceptions)
+        for query in queries
+    ]
+
+    manager = multiprocessing.Manager() if shared_cache else None
+    try:
+        cache_proxy = manager.dict() if manager else None
+        with multiprocessing.Pool(processes, _init_worker, ({source: limiter}, cache_proxy)) as pool:
+            return [_decode_results(_) for _ in pool.map(_search_worker, tasks, chunksize=chunksize)]
+    finally:
+        if manager:
+            manager.shutdown()
+
+
+def bulk_details(ids: Iterable[int | str],
+                 source: str = 'cloudmusic',
+                 processes: int | None = None,
+                 rate: float | SharedRateLimiter = 5.0,
+                 batch_size: int = 50,
+                 return_exceptions: bool = False,
+                 **details_kwargs
+                 ) -> list[SongDetail | BaseException]:
+    """使用多个进程批量获取歌曲的详细信息，所有进程共享同一个速率预算。
+
+    ID 会被分成多个批次，每个批次在一个工作进程中通过一次 ``details()`` 调用获取。
+
+    Args:
+        ids: 多个歌曲 ID（网易云音乐）或 mID（QQ 音乐）
+        source (str): 搜索来源，可选值见 ``supported_sources()``；默认为 ``'cloudmusic'``
+        processes (int | None): 工作进程的数量；默认为 CPU 核心数
+        rate (float | SharedRateLimiter): 所有进程合计每秒最多发出的请求数量，
+            或者一个已有的 ``SharedRateLimiter``；默认为 5
+        batch_size (int): 每个批次包含的 ID 数量，默认为 50
+        return_exceptions (bool): 将批次失败时引发的异常作为结果返回，而不是中止整个任务；默认为否
+        **details_kwargs: 传递给 ``details()`` 的其他参数
+    Raises:
+        ValueError: 为参数 ``source`` 指定了不支持的值
+        requests.RequestException: 网络、远端相关错误（``return_exceptions`` 为否时）
+
+    与 ``bulk_search()`` 相同，结果在进程之间以 ``serialization.encode()`` 的格式传递。
+    """
+    _check_source(source)
+    limiter = rate if isinstance(rate, SharedRateLimiter) else SharedRateLimiter(rate)
+    ids = list(ids)
+    tasks = [
+        (source, tuple(ids[i:i + batch_size]), details_kwargs, return_exceptions)
+        for i in range(0, len(ids), batch_size)
+    ]
+
+    ret = []
+    with multiprocessing.Pool(processes, _init_worker, ({source: limiter}, None)) as pool:
+        for batch_result in map(_decode_results, pool.imap(_details_worker, tasks)):
+            if isinstance(batch_result, BaseException):
+                ret.append(batch_result)
+            else:
+                ret.extend(batch_result)
+
+    return ret